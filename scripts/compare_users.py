@@ -0,0 +1,24 @@
+"""Compare answers between users, executing each notebook once per day."""
+
+from typer import Argument, Option, run
+
+from advent23_tests.attempts import USERS
+from advent23_tests.compare import get_answer_matrix, get_compared_users, walk_matrices
+
+
+def main(
+    day: str = Argument(help="Day to compare, or `all`."),
+    users: str = Option("all", help="Comma-separated users, or `all`."),
+):
+    compared = get_compared_users(users) if users else USERS
+    matrices = (
+        walk_matrices(compared)
+        if day.casefold() == "all"
+        else [get_answer_matrix(day.zfill(2), compared)]
+    )
+    for matrix in matrices:
+        print(matrix.get_report())  # noqa: T201
+
+
+if __name__ == "__main__":
+    run(main)
@@ -0,0 +1,47 @@
+"""Watch notebooks and inputs, re-running only tests affected by changes."""
+
+from time import sleep
+
+from typer import Option, run
+
+from advent23 import EXAMPLES
+from advent23_tests.attempts import USERS
+from advent23_tests.watch import Affected, Watcher, WatchWorker
+
+
+def main(
+    user: str = Option("any", help="User to watch, or `any`."),
+    day: str = Option("any", help="Day to watch, or `any`."),
+    full: bool = Option(False, help="Also execute notebooks on full inputs."),
+    interval: float = Option(0.25, help="Seconds between polls."),
+):
+    users = USERS if (user := user.casefold()) == "any" else (user,)
+    day = "" if day.casefold() == "any" else day.zfill(2)
+    watcher = Watcher(users)
+    worker = WatchWorker(full)
+    affected = Affected(examples={(u, d) for u in users for d in EXAMPLES})
+    try:
+        while True:
+            if affected.modules:
+                worker.restart()
+            affected.examples = keep(affected.examples, day)
+            affected.full = keep(affected.full, day)
+            if affected:
+                for line in worker.run(affected):
+                    print(line)  # noqa: T201
+                print("Watching for changes...")  # noqa: T201
+            sleep(interval)
+            affected = watcher.poll()
+    except KeyboardInterrupt:
+        return
+    finally:
+        worker.stop()
+
+
+def keep(attempts: set[tuple[str, str]], day: str) -> set[tuple[str, str]]:
+    """Keep attempts on a day, or all attempts if no day is given."""
+    return {(u, d) for u, d in attempts if not day or d == day}
+
+
+if __name__ == "__main__":
+    run(main)
@@ -3,23 +3,28 @@
 from __future__ import annotations
 
 from collections import UserDict
-from collections.abc import Collection
+from collections.abc import Collection, Iterable, Iterator, Mapping
 from dataclasses import dataclass
+from functools import cache
+from itertools import chain, islice
+from os import environ
 from pathlib import Path
-from re import MULTILINE, compile
-from tomllib import loads
-from typing import Any
+from re import MULTILINE, Match, compile
+from typing import Any, Literal, Self, get_args
 from warnings import warn
 
-from IPython.core.display import Markdown
-from IPython.display import display
+from advent23.inputs import load
 
 PARTS = ("a", "b")
 """Parts of the puzzle."""
 INPUT = Path("input")
 """Location of inputs for attempts."""
-HIDE = display()
-"""Hide unwanted output for a notebook code cell."""
+DisplayMode = Literal["eager", "deferred", "headless"]
+"""Display items when they are set, only when rendered on demand, or never."""
+DISPLAY_MODES: tuple[DisplayMode, ...] = get_args(DisplayMode)
+"""Display modes."""
+DISPLAY = "ADVENT23_DISPLAY"
+"""Environment variable setting the default display mode, e.g. for headless runs."""
 
 
 @dataclass
@@ -36,32 +41,148 @@ class Example:
             self.inp["b"] = self.inp["a"]
 
 
-EXAMPLES = {
-    str(ex["day"]).zfill(2): Example(ex["inp"], ex["chk"])
-    for ex in loads((INPUT / "examples.toml").read_text(encoding="utf-8"))["example"]
-}
+class Examples(Mapping[str, Example]):
+    """Puzzle examples, each parsed only when its day is first requested.
 
+    The examples file is only indexed by day, and is indexed again if it changes.
+    """
 
-def get_chk():
-    """Puzzle checkpoints."""
-    return CheckDict()
+    def __init__(self, path: Path = INPUT / "examples.toml"):
+        self.path = path
+        """Path to the examples file."""
 
+    @property
+    def sources(self) -> dict[str, str]:
+        """Source of the example for each zero-padded day."""
+        stat = self.path.stat()
+        return get_example_sources(self.path, stat.st_mtime_ns, stat.st_size)
 
-def get_inp(day: int | str, user: str = "", part: str = "") -> CheckDict:
-    """Puzzle inputs, with either example or full inputs filled in `a` and `b`."""
+    def __getitem__(self, day: str) -> Example:
+        return parse_example(self.sources[day])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.sources)
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+
+EXAMPLES = Examples()
+"""Puzzle examples by zero-padded day."""
+EXAMPLE_HEADER = compile(r"^\[\[example\]\][ \t]*$", flags=MULTILINE)
+"""Header of an example in the examples file."""
+EXAMPLE_DAY = compile(r"^day\s*=\s*(?P<day>\d+)", flags=MULTILINE)
+"""Day of an example in its source."""
+
+
+@cache
+def get_example_sources(path: Path, mtime_ns: int, size: int) -> dict[str, str]:  # noqa: ARG001
+    """Get the source of the example for each day, without parsing them.
+
+    Args:
+        path: Path to the examples file.
+        mtime_ns: Modification time of the examples file, to invalidate the cache.
+        size: Size of the examples file in bytes.
+    """
+    text = path.read_text(encoding="utf-8")
+    headers = list(EXAMPLE_HEADER.finditer(text))
+    sources: dict[str, str] = {}
+    for header, end in zip(headers, [*headers[1:], None], strict=True):
+        source = text[header.start() : end.start() if end else None]
+        if day := EXAMPLE_DAY.search(source):
+            sources[day["day"].zfill(2)] = source
+    return sources
+
+
+@cache
+def parse_example(source: str) -> Example:
+    """Parse the source of an example."""
+    from tomllib import loads
+
+    ex = loads(source)["example"][0]
+    return Example(ex["inp"], ex["chk"])
+
+
+def __getattr__(name: str) -> Any:
+    """Get attributes that are expensive to produce only when they're accessed.
+
+    Accessing `HIDE` hides unwanted output for a notebook code cell.
+    """
+    if name == "HIDE":
+        from IPython.display import display
+
+        return display()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_chk(display: DisplayMode | bool | None = None):
+    """Puzzle checkpoints.
+
+    Args:
+        display: Display mode. Defaults to the `ADVENT23_DISPLAY` environment variable,
+            or `eager` if unset. `True` and `False` are `eager` and `headless`.
+    """
+    return CheckDict(display=display)
+
+
+def get_inp(
+    day: int | str,
+    user: str = "",
+    part: str = "",
+    display: DisplayMode | bool | None = None,
+) -> CheckDict:
+    """Puzzle inputs, with either example or full inputs filled in `a` and `b`.
+
+    Full inputs are loaded once per process and shared between parts. See
+    `advent23.inputs.PuzzleInput` for line offsets and load timing.
+    """
     d = str(day).zfill(2) if isinstance(day, int) else day
     example_inputs = EXAMPLES[d].inp
     if not user:
-        return CheckDict(example_inputs)
-    full_input = (INPUT / user / f"{d}.txt").read_text(encoding="utf-8")
+        return CheckDict(example_inputs, display=display)
+    full_input = load(INPUT / user / f"{d}.txt")
     return CheckDict(
         example_inputs
-        | ({part: full_input} if part else {part: full_input for part in PARTS})
+        | ({part: full_input} if part else {part: full_input for part in PARTS}),
+        display=display,
     )
 
 
+def get_display_mode(display: DisplayMode | bool | None = None) -> DisplayMode:
+    """Get display mode, defaulting to the `ADVENT23_DISPLAY` environment variable.
+
+    Falls back to `eager` if the environment variable is unset or isn't a display mode.
+    """
+    if display is None:
+        env = environ.get(DISPLAY, "")
+        return env if env in DISPLAY_MODES else "eager"
+    if isinstance(display, bool):
+        return "eager" if display else "headless"
+    if display in DISPLAY_MODES:
+        return display
+    raise ValueError(f"Display mode must be one of {DISPLAY_MODES}.")
+
+
 class CheckDict(UserDict[str, Any]):
-    """Display items when they are set."""
+    """Display items when they are set, later on demand, or never.
+
+    In `eager` mode, items are displayed as they are set. In `deferred` mode, items
+    are recorded and only displayed by `render`. In `headless` mode, items are never
+    displayed, so no rendering work is done at all.
+    """
+
+    def __init__(
+        self,
+        dict: Any = None,  # noqa: A002
+        /,
+        display: DisplayMode | bool | None = None,
+        **kwargs: Any,
+    ):
+        self.mode = get_display_mode(display)
+        """Display mode."""
+        self.pending: list[tuple[str, Any]] = []
+        """Items yet to be displayed in `deferred` mode."""
+        super().__init__(dict, **kwargs)
 
     def __setitem__(self, key, item):
         super().__setitem__(key, item)
@@ -69,9 +190,51 @@ class CheckDict(UserDict[str, Any]):
             warn(f'Set  "{key}" to `None`.', stacklevel=2)
         if item == "":
             warn(f'Set  "{key}" to `""` (empty string).', stacklevel=2)
-        if key == "b" and (a := self.get("a")) and item == a:
-            item = "<same as part 1>"
-        disp_name(make_readable(key), item)
+        self.disp(key, item)
+
+    def disp(self, name: str, elem: Any):
+        """Display an object with its name above it, depending on display mode."""
+        if self.mode == "headless":
+            return
+        if self.mode == "deferred":
+            self.pending.append((name, elem))
+            return
+        self.show(name, elem)
+
+    def render(self):
+        """Display items deferred since the last render."""
+        pending, self.pending = self.pending, []
+        for name, elem in pending:
+            self.show(name, elem)
+
+    def show(self, name: str, elem: Any):
+        """Display an object with its name above it."""
+        if name == "b" and (a := self.get("a")) and elem == a:
+            elem = "<same as part 1>"
+        disp_name(make_readable(name), elem)
+
+    def dumps(self) -> bytes:
+        """Serialize items compactly, replacing matches with snapshots of them.
+
+        Matches can't be pickled, so they're replaced by snapshots, which
+        `advent23.matches.check_match` accepts in place of matches.
+        """
+        from pickle import HIGHEST_PROTOCOL, dumps
+        from zlib import compress
+
+        from advent23.matches import snapshot
+
+        return compress(dumps(snapshot(self.data), HIGHEST_PROTOCOL))
+
+    @classmethod
+    def loads(cls, data: bytes, display: DisplayMode | bool | None = None) -> Self:
+        """Deserialize items serialized by `dumps`, without displaying them."""
+        from pickle import loads
+        from zlib import decompress
+
+        chk = cls(display=display)
+        chk.data = loads(decompress(data))
+        return chk
 
 
 def disp_names(*args: tuple[str, Any]):
@@ -82,42 +245,156 @@ def disp_names(*args: tuple[str, Any]):
 
 def disp_name(name: str, elem: Any):
     """Display an object with its name above it."""
+    from IPython.core.display import Markdown
+    from IPython.display import display
+
     display(Markdown(f"#### {make_readable(name)}"))
     if isinstance(elem, str):
-        print(truncate(str(elem)))  # noqa: T201
+        print(preview(elem))  # noqa: T201
         return
     if isinstance(elem, Collection) and len(elem) > LINE_LIMIT:
-        print(truncate(str(elem).replace(",", ",\n")))  # noqa: T201
+        print(preview(elem))  # noqa: T201
         return
     display(elem)
 
 
 def truncate(string: str) -> str:
     """Truncate long strings."""
-    string = (
-        f"{match.group()}... <view truncated> ..."
-        if (match := long_string.match(string))
-        else string
+    return format_preview(*take_lines([string]))
+
+
+def preview(elem: Any) -> str:
+    """Preview an object, truncated, doing work proportional to the preview.
+
+    Strings are previewed as-is. Other objects are previewed as their string
+    representation with a line break after each comma, which is built lazily from
+    lists, tuples, dicts, sets, strings, and matches, and stops being built once the
+    preview is full. Other objects are represented in full.
+    """
+    if isinstance(elem, str):
+        return truncate(elem)
+    return format_preview(
+        *take_lines(chunk.replace(",", ",\n") for chunk in iter_repr(elem, top=True))
     )
-    if any(wide_strings(string)):
-        lines = truncated_lines(string)
-        lines[0] = f"{lines[0]}{WIDTH_MSG_FIRST}"
-        string = lines[0] + "\n" + f"{WIDTH_MSG}\n".join(lines[1:])
-    return string
+
+
+def take_lines(chunks: Iterable[str]) -> tuple[list[str], bool, bool]:
+    """Take lines of text from chunks, up to the line limit.
+
+    Only keeps lines up to the width limit, but tracks whether any were wider.
+
+    Returns:
+        Lines, whether any are at least as wide as the limit, and whether the line
+        limit was reached.
+    """
+    lines: list[str] = []
+    line: list[str] = []
+    width = 0
+    wide = False
+    for chunk in chunks:
+        pos = 0
+        while True:
+            end = len(chunk) if (newline := chunk.find("\n", pos)) < 0 else newline
+            if width < WIDTH_LIMIT:
+                line.append(chunk[pos : min(end, pos + WIDTH_LIMIT - width)])
+            width += end - pos
+            if newline < 0:
+                break
+            lines.append("".join(line))
+            wide |= width >= WIDTH_LIMIT
+            if len(lines) == LINE_LIMIT:
+                return lines, wide, True
+            line = []
+            width = 0
+            pos = newline + 1
+    lines.append("".join(line))
+    return lines, wide or width >= WIDTH_LIMIT, False
+
+
+def format_preview(lines: list[str], wide: bool, long: bool) -> str:
+    """Format lines taken for a preview, noting truncated lines and width."""
+    if long:
+        lines = [*lines, "... <view truncated> ..."]
+    if not wide:
+        return "\n".join(lines)
+    return f"{lines[0]}{WIDTH_MSG_FIRST}\n" + f"{WIDTH_MSG}\n".join(lines[1:])
+
+
+def iter_repr(
+    elem: Any, top: bool = False, seen: set[int] | None = None
+) -> Iterator[str]:
+    """Iterate over chunks of the representation of an object, building it lazily.
+
+    Args:
+        elem: Object to represent.
+        top: Whether to represent the object as `str` would, rather than `repr`.
+        seen: Identities of containers being represented, to handle recursion.
+    """
+    seen = set() if seen is None else seen
+    kind = type(elem)
+    if kind is str:
+        yield from iter_str_repr(elem)
+        return
+    if kind is Match and isinstance(text := elem.group(), str):
+        # Matches show only the start of the representation of their text
+        shown = "".join(islice(chain.from_iterable(iter_str_repr(text)), MATCH_REPR))
+        yield f"<re.Match object; span={elem.span()!r}, match={shown}>"
+        return
+    if kind not in {list, tuple, dict, set, frozenset}:
+        yield str(elem) if top else repr(elem)
+        return
+    if kind in {set, frozenset} and not elem:
+        yield f"{kind.__name__}()"
+        return
+    left, right = {
+        list: ("[", "]"),
+        tuple: ("(", ",)" if len(elem) == 1 else ")"),
+        dict: ("{", "}"),
+        set: ("{", "}"),
+        frozenset: ("frozenset({", "})"),
+    }[kind]
+    if id(elem) in seen:
+        yield f"{left}...{right}" if kind is not tuple else "(...)"
+        return
+    seen.add(id(elem))
+    yield left
+    for i, item in enumerate(elem.items() if kind is dict else elem):
+        if i:
+            yield ", "
+        if kind is dict:
+            yield from iter_repr(item[0], seen=seen)
+            yield ": "
+            yield from iter_repr(item[1], seen=seen)
+        else:
+            yield from iter_repr(item, seen=seen)
+    yield right
+    seen.discard(id(elem))
+
+
+def iter_str_repr(string: str) -> Iterator[str]:
+    """Iterate over chunks of the representation of a string."""
+    if len(string) <= REPR_CHUNK:
+        yield repr(string)
+        return
+    # Quote as `repr` would, escaping single quotes by also ending chunks with both
+    quote = '"' if "'" in string and '"' not in string else "'"
+    yield quote
+    for i in range(0, len(string), REPR_CHUNK):
+        chunk = string[i : i + REPR_CHUNK]
+        yield repr(chunk)[1:-1] if quote == '"' else repr(f"{chunk}'\"")[1:-4]
+    yield quote
 
 
 LINE_LIMIT = 15
 """Line limit before output will be truncated."""
-long_string = compile(rf"^(?:.*\n){{{LINE_LIMIT}}}")
-"""String with lots of newlines."""
 WIDTH_MSG_FIRST = " <...view truncated>"
 WIDTH_MSG = " <...>"
 WIDTH_LIMIT = 88 - len(WIDTH_MSG_FIRST)
 """Width limit before lines will be truncated."""
-wide_strings = compile(rf"^.{{{WIDTH_LIMIT},}}", flags=MULTILINE).findall
-"""List of long lines."""
-truncated_lines = compile(rf"^.{{,{WIDTH_LIMIT}}}", flags=MULTILINE).findall
-"""List of all lines, truncated to maximum width."""
+REPR_CHUNK = 1024
+"""Size of chunks of long strings to represent at a time when previewing."""
+MATCH_REPR = 50
+"""Characters of the representation of matched text that matches show."""
 
 
 def make_readable(string: str) -> str:
@@ -1,47 +1,64 @@
 """Abdul's solutions."""
 
-import re
+from functools import lru_cache
+from math import inf
+from typing import cast
+
+import numpy as np
+import pandas as pd
+
+from advent23.games import CACHED, COLORS, LIMITS, parse_games
 
 
 def color_outcome(color: str, data_input):
     """Return a list of sets which represent the outcome of
     each color for all games.
     """
-    color_outcome_all_games = []
+    pulls = parse_pulls("\n".join(data_input))
+    if pulls.empty:
+        return []
+    firsts = np.flatnonzero(pulls.index.get_level_values("pull") == 0)
+    games = np.split(pulls[color].to_numpy(), firsts[1:])
+    return [set(counts.tolist()) for counts in games]
 
-    number_pattern = re.compile(pattern=r"(Game \d{1,5}):\s")
-    color_pattern = re.compile(pattern=rf"(\d{{1,5}} {color})")
 
-    for game in data_input:
-        # Separate each game into separate pulls
-        m = re.search(number_pattern, game)
-        game_pulls = game[m.end() :]
-        single_pull = re.split(r";\s+", game_pulls)
-        temp_set = set()
+def compare_color_set(color_set: set, color: str):
+    if max(color_set, default=0) > LIMITS.get(color, inf):
+        return False
+    return color_set
 
-        # Populate set for each game containing all results for color
-        for each_outcome in single_pull:
-            color_result = re.search(color_pattern, each_outcome)
-            if color_result is not None:
-                temp_set.add(int(color_result[0].strip(f"{color}")))
-            else:
-                temp_set.add(0)
 
-        color_outcome_all_games.append(temp_set)
+def get_maxima(data_input) -> pd.DataFrame:
+    """Get the most cubes of each color revealed in each game, in input order."""
+    pulls = parse_pulls("\n".join(data_input))
+    return cast(pd.DataFrame, pulls.groupby(level="game", sort=False).max())
 
-    print(color_outcome_all_games)  # noqa: T201
-    return color_outcome_all_games
 
+def get_possible(maxima: pd.DataFrame) -> pd.Series:
+    """Get whether each game is possible given the cubes in the bag."""
+    return (maxima <= pd.Series(LIMITS)).all(axis="columns")
 
-def compare_color_set(color_set: set, color: str):
-    for val in color_set:
-        if color == "red" and val > 12:
-            return False
-        if color == "green" and val > 13:
-            return False
-        if color == "blue" and val > 14:
-            return False
-    return color_set
+
+def get_powers(maxima: pd.DataFrame) -> pd.Series:
+    """Get the power of the fewest cubes that make each game possible."""
+    return maxima.prod(axis="columns")
+
+
+@lru_cache(maxsize=CACHED)
+def parse_pulls(text: str) -> pd.DataFrame:
+    """Get the count of each color in each pull of each game from the shared table.
+
+    Returns a frame indexed by game and pull in input order, with a column of counts
+    for each color, zero where a pull didn't reveal that color. Frames of the most
+    recently parsed texts are cached, so copy them before modifying them.
+    """
+    games = parse_games(text)
+    return pd.DataFrame(
+        {color: getattr(games, color) for color in COLORS},
+        index=pd.MultiIndex.from_arrays(
+            [games.game, games.pull], names=["game", "pull"]
+        ),
+    )
 
 
 # Ruff thinks we don't need the `color` argument below, we must've changed this function
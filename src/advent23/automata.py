@@ -0,0 +1,194 @@
+"""Find many words at once with an Aho-Corasick automaton, such as digits on day 1."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable
+from functools import cache
+from typing import Any, NamedTuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+CHUNK = 2**16
+"""Number of characters to step through at once, keeping temporary arrays in cache."""
+NEWLINE = ord("\n")
+"""Character code of line endings."""
+NUMBERS = (
+    "zero",
+    "one",
+    "two",
+    "three",
+    "four",
+    "five",
+    "six",
+    "seven",
+    "eight",
+    "nine",
+)
+"""Spelled-out digits, each word at the index of its value."""
+DIGITS = tuple("0123456789")
+"""Digits, each at the index of its value."""
+
+
+class Matches(NamedTuple):
+    """Overlapping matches of words, ordered by where they end."""
+
+    starts: NDArray[np.intp]
+    """Position of the first character of each match."""
+    words: NDArray[np.intp]
+    """Index of the word matched."""
+    lines: NDArray[np.intp]
+    """Index of the line each match is in."""
+
+
+class Automaton:
+    """Aho-Corasick automaton that finds overlapping matches of words in one pass.
+
+    Transitions are tabulated for every state and character, so the state after any
+    character only depends on the characters before it, as far back as the longest
+    word. States are found for the whole text at once by stepping that many times,
+    rather than by stepping character by character.
+    """
+
+    words: tuple[str, ...]
+    """Words to find, which shouldn't span lines."""
+    lengths: NDArray[np.intp]
+    """Length of each word."""
+    transitions: NDArray[np.intp]
+    """Next state for each state and character code."""
+    outputs: NDArray[np.intp]
+    """Indices of words ending at each state, longest first, padded with `-1`."""
+
+    def __init__(self, words: Iterable[str]):
+        """Build an automaton for some words.
+
+        Args:
+            words: At least one word of ASCII characters, without line endings.
+        """
+        self.words = tuple(words)
+        if not self.words or not all(self.words) or "\n" in "".join(self.words):
+            raise ValueError("Words must be non-empty and without line endings.")
+        self.lengths = np.array([len(word) for word in self.words], dtype=np.intp)
+        goto: list[dict[int, int]] = [{}]
+        ends: list[list[int]] = [[]]
+        for index, word in enumerate(self.words):
+            state = 0
+            for code in word.encode("ascii"):
+                if code not in goto[state]:
+                    goto[state][code] = len(goto)
+                    goto.append({})
+                    ends.append([])
+                state = goto[state][code]
+            ends[state].append(index)
+        self.transitions = np.zeros((len(goto), 256), dtype=np.intp)
+        self.transitions[0, list(goto[0])] = list(goto[0].values())
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            ends[state].extend(ends[fail[state]])
+            self.transitions[state] = self.transitions[fail[state]]
+            for code, child in goto[state].items():
+                fail[child] = self.transitions[fail[state], code]
+                self.transitions[state, code] = child
+                queue.append(child)
+        self.outputs = np.full((len(goto), max(map(len, ends))), -1, dtype=np.intp)
+        for state, found in enumerate(ends):
+            self.outputs[state, : len(found)] = sorted(
+                found, key=lambda i: -self.lengths[i]
+            )
+
+    def get_states(self, codes: NDArray[np.uint8]) -> NDArray[np.unsignedinteger[Any]]:
+        """Get the state after each character code, in chunks of `CHUNK` codes.
+
+        States are 16-bit if there are few enough of them, halving the work of looking
+        up transitions.
+        """
+        depth = int(self.lengths.max())
+        padded = np.concatenate([np.zeros(depth - 1, dtype=np.uint8), codes])
+        index = np.uint16 if len(self.transitions) <= 2**8 else np.uint64
+        flat = self.transitions.astype(index).ravel()
+        states = np.empty(len(codes), dtype=index)
+        for begin in range(0, len(codes), CHUNK):
+            end = min(begin + CHUNK, len(codes))
+            state = np.zeros(end - begin, dtype=index)
+            for step in range(depth):
+                state = flat[(state << 8) | padded[begin + step : end + step]]
+            states[begin:end] = state
+        return states
+
+    def find(self, text: str) -> Matches:
+        """Find overlapping matches of words in a text of ASCII characters."""
+        codes = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+        states = self.get_states(codes)
+        ends, ranks = np.nonzero(self.outputs[states] >= 0)
+        words = self.outputs[states[ends], ranks]
+        starts = ends - self.lengths[words] + 1
+        lines = np.searchsorted(np.flatnonzero(codes == NEWLINE), starts)
+        return Matches(starts, words, lines)
+
+    def first_last(self, text: str) -> tuple[NDArray[np.intp], NDArray[np.intp]]:
+        """Get the first and last word found in each line of a text, or `-1` if none.
+
+        Matches are ordered by where they start, and the longer of two matches that
+        start together comes first when finding the first word, and last when finding
+        the last word. Only the few positions where matches end nearest the start and
+        end of each line are inspected, since no match is longer than the longest word.
+        """
+        codes = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+        states = self.get_states(codes)
+        counts = (self.outputs >= 0).sum(axis=1)
+        longest = self.outputs[:, 0]
+        shortest = self.outputs[np.arange(len(counts)), np.maximum(counts - 1, 0)]
+        ends = np.flatnonzero((longest >= 0)[states])
+        newlines = np.flatnonzero(codes == NEWLINE)
+        lines = len(newlines) + bool(text and not text.endswith("\n"))
+        line_starts = np.concatenate([[0], newlines + 1])[:lines]
+        line_stops = np.append(newlines, len(codes))[:lines]
+        if not len(ends):
+            return np.full(lines, -1, dtype=np.intp), np.full(lines, -1, dtype=np.intp)
+        depth = int(self.lengths.max())
+        result: list[NDArray[np.intp]] = []
+        for nearest, outputs, sign in (
+            (np.searchsorted(ends, line_starts), longest, -1),
+            (np.searchsorted(ends, line_stops) - 1, shortest, 1),
+        ):
+            found = np.full(lines, -1, dtype=np.intp)
+            best = np.full(lines, np.iinfo(np.intp).min, dtype=np.intp)
+            for step in range(depth):
+                candidates = nearest - sign * step
+                valid = (candidates >= 0) & (candidates < len(ends))
+                end = ends[np.clip(candidates, 0, len(ends) - 1)]
+                valid &= (end >= line_starts) & (end < line_stops)
+                words = outputs[states[end]]
+                lengths = self.lengths[words]
+                # Latest start for the last word, earliest for the first, then longest
+                key = sign * (end - lengths + 1) * (depth + 1) + lengths
+                better = valid & (key > best)
+                best[better] = key[better]
+                found[better] = words[better]
+            result.append(found)
+        first, last = result
+        return first, last
+
+
+def get_calibration_values(text: str, numbers: bool = True) -> NDArray[np.intp]:
+    """Get the first and last digit of each line as a two-digit number.
+
+    Lines without digits have a value of zero.
+
+    Args:
+        text: Calibration document.
+        numbers: Also find spelled-out digits, such as `one`.
+    """
+    automaton = get_automaton(numbers)
+    first, last = automaton.first_last(text)
+    values = np.arange(len(automaton.words)) % len(DIGITS)
+    return np.where(first >= 0, 10 * values[first] + values[last], 0)
+
+
+@cache
+def get_automaton(numbers: bool = True) -> Automaton:
+    """Get an automaton for digits, and optionally spelled-out digits."""
+    return Automaton(DIGITS + NUMBERS if numbers else DIGITS)
@@ -0,0 +1,114 @@
+"""Games of cubes pulled from a bag, parsed once into columns, for day 2."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from pathlib import Path
+from re import compile
+
+import numpy as np
+from numpy.typing import NDArray
+
+from advent23.inputs import load
+
+COLORS = ("red", "green", "blue")
+"""Colors of cubes, in the order of columns of counts."""
+LIMITS = {"red": 12, "green": 13, "blue": 14}
+"""Most cubes of each color in the bag."""
+PULLS = compile(
+    r"Game (?P<game>\d+):|(?P<end>;)|(?P<count>\d+) (?P<color>red|green|blue)"
+)
+"""Game headers, ends of pulls, and counts of colors revealed in pulls."""
+CACHED = 8
+"""Number of texts to keep parsed tables of.
+
+Enough for the example and full inputs of each user, while edited inputs don't pile up
+in memory.
+"""
+
+
+@dataclass(frozen=True)
+class Games:
+    """Table of pulls from games, a row per pull, in input order."""
+
+    game: NDArray[np.int64]
+    """Game of each pull."""
+    pull: NDArray[np.int64]
+    """Index of each pull within its game."""
+    red: NDArray[np.int64]
+    """Red cubes revealed in each pull."""
+    green: NDArray[np.int64]
+    """Green cubes revealed in each pull."""
+    blue: NDArray[np.int64]
+    """Blue cubes revealed in each pull."""
+
+    @cached_property
+    def starts(self) -> NDArray[np.intp]:
+        """Row of the first pull of each game."""
+        return np.flatnonzero(self.pull == 0)
+
+    @property
+    def ids(self) -> NDArray[np.int64]:
+        """Number of each game, in input order."""
+        return self.game[self.starts]
+
+    @property
+    def counts(self) -> NDArray[np.int64]:
+        """Cubes of each color revealed in each pull, with a column per color."""
+        return np.column_stack([getattr(self, color) for color in COLORS])
+
+    @cached_property
+    def maxima(self) -> NDArray[np.int64]:
+        """Most cubes of each color revealed in each game, with a column per color.
+
+        These are also the fewest cubes of each color that make each game possible.
+        """
+        if not len(self.starts):
+            return np.zeros((0, len(COLORS)), dtype=np.int64)
+        return np.maximum.reduceat(self.counts, self.starts, axis=0)
+
+    @property
+    def powers(self) -> NDArray[np.int64]:
+        """Power of the fewest cubes that make each game possible."""
+        return self.maxima.prod(axis=1)
+
+    def possible(self, limits: Mapping[str, int] = LIMITS) -> NDArray[np.bool_]:
+        """Get whether each game is possible given the cubes in the bag."""
+        return np.asarray(
+            (self.maxima <= [limits[color] for color in COLORS]).all(axis=1)
+        )
+
+
+@lru_cache(maxsize=CACHED)
+def parse_games(text: str) -> Games:
+    """Parse the count of each color in each pull of each game in one pass.
+
+    Colors that a pull didn't reveal count as zero. Tables of the most recently parsed
+    texts are cached, so don't modify their columns.
+    """
+    game: list[int] = []
+    pull: list[int] = []
+    counts: list[int] = []
+    current = index = 0
+    for match in PULLS.finditer(text):
+        if match["game"]:
+            current, index = int(match["game"]), 0
+        elif match["end"]:
+            index += 1
+        else:
+            counts[COLORS.index(match["color"]) - len(COLORS)] += int(match["count"])
+            continue
+        game.append(current)
+        pull.append(index)
+        counts.extend([0] * len(COLORS))
+    red, green, blue = np.array(counts, dtype=np.int64).reshape(-1, len(COLORS)).T
+    return Games(
+        np.array(game, dtype=np.int64), np.array(pull, dtype=np.int64), red, green, blue
+    )
+
+
+def load_games(path: Path) -> Games:
+    """Load and parse games, only parsing them again if the input has changed."""
+    return parse_games(load(path))
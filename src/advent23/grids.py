@@ -0,0 +1,105 @@
+"""Character grids, parsed once into arrays for neighborhood queries."""
+
+from __future__ import annotations
+
+from functools import cached_property
+from re import compile
+
+import numpy as np
+from numpy.typing import NDArray
+
+SPAN = r"\d+"
+"""Default pattern for spans, such as part numbers."""
+
+
+class Grid:
+    """Character grid with an index of spans, such as numbers, by position.
+
+    Spans don't cross rows. Each cell of `span_ids` holds the index of the span
+    covering it, or `-1`, so the spans around any point are found in constant time.
+    """
+
+    chars: NDArray[np.uint8]
+    """Character codes of each cell, with rows and columns as axes."""
+    span_text: list[str]
+    """Text of each span."""
+    span_rows: NDArray[np.intp]
+    """Row of each span."""
+    span_starts: NDArray[np.intp]
+    """First column of each span."""
+    span_ends: NDArray[np.intp]
+    """Column after the last column of each span."""
+    span_ids: NDArray[np.intp]
+    """Index of the span covering each cell, or `-1` if none does."""
+
+    def __init__(self, text: str, span: str = SPAN):
+        """Parse a grid of ASCII characters with rows of equal width.
+
+        Args:
+            text: Grid, with a row per line.
+            span: Pattern matching spans within rows.
+        """
+        if not text.endswith("\n"):
+            text += "\n"
+        stride = text.find("\n") + 1
+        if len(text) % stride or text[stride - 1 :: stride].strip("\n"):
+            raise ValueError("Grid rows must have equal widths.")
+        self.chars = np.frombuffer(text.encode("ascii"), dtype=np.uint8).reshape(
+            -1, stride
+        )[:, :-1]
+        matches = list(compile(span).finditer(text))
+        self.span_text = [match.group() for match in matches]
+        spans = [match.span() for match in matches]
+        bounds = np.array(spans, dtype=np.intp).reshape(-1, 2)
+        self.span_rows, self.span_starts = np.divmod(bounds[:, 0], stride)
+        self.span_ends = self.span_starts + bounds[:, 1] - bounds[:, 0]
+        self.span_ids = np.full(self.chars.shape, -1, dtype=np.intp)
+        lengths = self.span_ends - self.span_starts
+        firsts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        self.span_ids[
+            np.repeat(self.span_rows, lengths),
+            np.repeat(self.span_starts, lengths) + np.arange(lengths.sum()) - firsts,
+        ] = np.repeat(np.arange(len(matches)), lengths)
+
+    @cached_property
+    def span_values(self) -> NDArray[np.int64]:
+        """Integer value of each span."""
+        return np.array(self.span_text, dtype=np.int64)
+
+    def mask(self, chars: str) -> NDArray[np.bool_]:
+        """Get whether each cell is one of some characters."""
+        return np.isin(self.chars, np.frombuffer(chars.encode("ascii"), np.uint8))
+
+    def points(self, mask: NDArray[np.bool_]) -> NDArray[np.intp]:
+        """Get the row and column of each point in a mask, in row-major order."""
+        return np.argwhere(mask)
+
+    def touching(self, mask: NDArray[np.bool_]) -> NDArray[np.bool_]:
+        """Get whether each span touches a point in a mask, including diagonally.
+
+        Counts the points near each cell in cumulative sums along rows, so each span
+        is checked in constant time after a single pass over the grid.
+        """
+        near = dilate(mask)
+        counts = np.zeros((near.shape[0], near.shape[1] + 1), dtype=np.intp)
+        np.cumsum(near, axis=1, out=counts[:, 1:])
+        return (
+            counts[self.span_rows, self.span_ends]
+            > counts[self.span_rows, self.span_starts]
+        )
+
+    def neighbors(self, row: int, col: int) -> list[int]:
+        """Get the indices of spans touching a point, including diagonally."""
+        window = self.span_ids[max(row - 1, 0) : row + 2, max(col - 1, 0) : col + 2]
+        return np.unique(window[window >= 0]).tolist()
+
+
+def dilate(mask: NDArray[np.bool_]) -> NDArray[np.bool_]:
+    """Grow a mask by one cell in every direction, including diagonally."""
+    wide = mask.copy()
+    wide[:, 1:] |= mask[:, :-1]
+    wide[:, :-1] |= mask[:, 1:]
+    near = wide.copy()
+    near[1:] |= wide[:-1]
+    near[:-1] |= wide[1:]
+    return near
@@ -0,0 +1,67 @@
+"""Puzzle inputs, loaded once per process and shared between parts."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator
+from functools import cached_property
+from pathlib import Path
+from time import perf_counter
+
+
+class PuzzleInput(str):
+    """Puzzle input, with an index of line offsets and the time it took to load."""
+
+    # Subclasses of `str` only support `__dict__` slots, which attributes need
+    __slots__ = ("__dict__",)
+
+    path: Path
+    """Path to the input."""
+    load_time: float
+    """Time it took to load the input, in seconds."""
+
+    @cached_property
+    def line_offsets(self) -> array[int]:
+        """Offsets of the start of each line, and of the end of the input."""
+        offsets = array("q", [0])
+        find = self.find
+        pos = 0
+        while (pos := find("\n", pos) + 1) > 0:
+            offsets.append(pos)
+        if offsets[-1] != len(self):
+            offsets.append(len(self))
+        return offsets
+
+    def line(self, index: int) -> str:
+        """Get a line, without its line ending, by index."""
+        offsets = self.line_offsets
+        start, end = offsets[index], offsets[index + 1]
+        return self[start : end - 1 if self[end - 1 : end] == "\n" else end]
+
+    def iter_lines(self) -> Iterator[str]:
+        """Iterate over lines, without line endings or splitting them all at once."""
+        for index in range(len(self.line_offsets) - 1):
+            yield self.line(index)
+
+
+LOADED: dict[Path, tuple[tuple[int, int], PuzzleInput]] = {}
+"""Latest version of each loaded input by path, with its mtime and size."""
+
+
+def load(path: Path) -> PuzzleInput:
+    """Load an input, only reading it again if it has changed since last loaded.
+
+    Only the latest version of each input is kept, so inputs that change while
+    attempts are watched don't pile up in memory.
+    """
+    stat = path.stat()
+    path = path.resolve()
+    version = (stat.st_mtime_ns, stat.st_size)
+    if (loaded := LOADED.get(path)) and loaded[0] == version:
+        return loaded[1]
+    start = perf_counter()
+    inp = PuzzleInput(path.read_text(encoding="utf-8"))
+    inp.path = path
+    inp.load_time = perf_counter() - start
+    LOADED[path] = (version, inp)
+    return inp
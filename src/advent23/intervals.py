@@ -0,0 +1,168 @@
+"""Maps that shift ranges of integers, for almanacs like that of day 5."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from functools import cached_property, reduce
+from itertools import chain
+from operator import itemgetter
+from typing import Self
+
+Range = tuple[int, int]
+"""Range of integers from a start up to, but not including, a stop."""
+
+
+@dataclass(frozen=True)
+class RangeMap:
+    """Map that shifts integers by an offset depending on the piece they're in.
+
+    Breakpoints split the integers into pieces, piece `i` spanning from breakpoint
+    `i - 1` up to breakpoint `i`, with the first and last pieces unbounded. Values are
+    looked up by bisection, and ranges are mapped by splitting them at breakpoints.
+    """
+
+    bounds: tuple[int, ...] = ()
+    """Sorted breakpoints between pieces."""
+    offsets: tuple[int, ...] = (0,)
+    """Offset of each piece, one more than there are breakpoints."""
+
+    @classmethod
+    def from_rules(cls, rules: Iterable[tuple[int, int, int]]) -> Self:
+        """Get a map from rules, leaving values that no rule covers unchanged.
+
+        Args:
+            rules: Destination start, source start, and length of each range.
+        """
+        bounds: list[int] = []
+        offsets = [0]
+        for dest, src, length in sorted(rules, key=itemgetter(1)):
+            if not length:
+                continue
+            if bounds and src < bounds[-1]:
+                raise ValueError(f"Rule for source {src} overlaps another rule.")
+            if bounds and src == bounds[-1]:
+                offsets[-1] = dest - src
+            else:
+                bounds.append(src)
+                offsets.append(dest - src)
+            bounds.append(src + length)
+            offsets.append(0)
+        return cls.from_pieces(bounds, offsets)
+
+    @classmethod
+    def from_pieces(cls, bounds: Sequence[int], offsets: Sequence[int]) -> Self:
+        """Get a map from pieces, dropping breakpoints between equal offsets.
+
+        Args:
+            bounds: Sorted breakpoints between pieces.
+            offsets: Offset of each piece, one more than there are breakpoints.
+        """
+        merged_bounds: list[int] = []
+        merged_offsets = [offsets[0]]
+        for bound, offset in zip(bounds, offsets[1:], strict=True):
+            if merged_bounds and bound == merged_bounds[-1]:
+                merged_bounds.pop()
+                merged_offsets.pop()
+            if offset != merged_offsets[-1]:
+                merged_bounds.append(bound)
+                merged_offsets.append(offset)
+        return cls(tuple(merged_bounds), tuple(merged_offsets))
+
+    def __call__(self, value: int) -> int:
+        """Map a value."""
+        return value + self.offsets[bisect_right(self.bounds, value)]
+
+    def map_range(self, start: int, stop: int) -> Iterator[Range]:
+        """Map a range, splitting it wherever it crosses a breakpoint."""
+        i = bisect_right(self.bounds, start)
+        while start < stop:
+            end = min(stop, self.bounds[i]) if i < len(self.bounds) else stop
+            yield start + self.offsets[i], end + self.offsets[i]
+            start = end
+            i += 1
+
+    def map_ranges(self, ranges: Iterable[Range]) -> list[Range]:
+        """Map ranges, merging the results into sorted, disjoint ranges."""
+        return merge_ranges(chain.from_iterable(self.map_range(*r) for r in ranges))
+
+    def then(self, other: RangeMap) -> RangeMap:
+        """Compose this map with another that is applied after it."""
+        bounds: list[int] = []
+        offsets: list[int] = []
+        for i, offset in enumerate(self.offsets):
+            first = 0
+            last = len(other.bounds)
+            if i:
+                bounds.append(lo := self.bounds[i - 1])
+                first = bisect_right(other.bounds, lo + offset)
+            if i < len(self.bounds):
+                last = bisect_left(other.bounds, self.bounds[i] + offset)
+            offsets.append(offset + other.offsets[first])
+            for j in range(first, last):
+                bounds.append(other.bounds[j] - offset)
+                offsets.append(offset + other.offsets[j + 1])
+        return self.from_pieces(bounds, offsets)
+
+
+def compose(maps: Iterable[RangeMap]) -> RangeMap:
+    """Compose maps into one, applying them in order."""
+    return reduce(RangeMap.then, maps, RangeMap())
+
+
+def merge_ranges(ranges: Iterable[Range]) -> list[Range]:
+    """Merge ranges into sorted, disjoint ranges, dropping empty ones."""
+    merged: list[Range] = []
+    for start, stop in sorted(r for r in ranges if r[0] < r[1]):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(stop, merged[-1][1]))
+        else:
+            merged.append((start, stop))
+    return merged
+
+
+@dataclass(frozen=True)
+class Almanac:
+    """Seeds and the maps that take them to locations."""
+
+    seeds: tuple[int, ...]
+    """Seeds, or starts and lengths of seed ranges."""
+    maps: dict[str, RangeMap] = field(default_factory=dict)
+    """Maps in the order they're applied, by name, such as `seed-to-soil`."""
+
+    @cached_property
+    def chain(self) -> RangeMap:
+        """All maps composed into one."""
+        return compose(self.maps.values())
+
+    @property
+    def seed_ranges(self) -> list[Range]:
+        """Seeds taken as pairs of range starts and lengths."""
+        return [
+            (start, start + length)
+            for start, length in zip(self.seeds[::2], self.seeds[1::2], strict=True)
+        ]
+
+    def locations(self) -> list[int]:
+        """Get the location of each seed."""
+        return [self.chain(seed) for seed in self.seeds]
+
+    def lowest_location(self, ranges: Iterable[Range]) -> int:
+        """Get the lowest location of any seed in some ranges."""
+        if not (locations := self.chain.map_ranges(ranges)):
+            raise ValueError("No seeds in ranges to find the lowest location of.")
+        return locations[0][0]
+
+
+def parse_almanac(text: str) -> Almanac:
+    """Parse an almanac of seeds followed by blocks of rules, one per map."""
+    seeds, *blocks = text.strip().split("\n\n")
+    maps: dict[str, RangeMap] = {}
+    for block in blocks:
+        header, *rules = block.splitlines()
+        maps[header.removesuffix(" map:")] = RangeMap.from_rules(
+            (dest, src, length)
+            for dest, src, length in (map(int, rule.split()) for rule in rules)
+        )
+    return Almanac(tuple(map(int, seeds.removeprefix("seeds:").split())), maps)
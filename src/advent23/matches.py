@@ -0,0 +1,125 @@
+"""Snapshots of regex matches, which can be pickled unlike the matches themselves."""
+
+from __future__ import annotations
+
+from functools import cache
+from re import Match, Pattern
+from typing import Any
+
+
+class MatchSnapshot:
+    """Snapshot of a match, with the same accessors for groups and their spans.
+
+    Holds the matched text rather than the string that was searched, so snapshots
+    are cheap to keep, and can be pickled unlike `re.Match`. Unlike `re.Match`, there
+    is no `string` or `pos`, since the searched string isn't kept.
+    """
+
+    __slots__ = ("text", "text_start", "regs", "groupindex")
+
+    text: str
+    """Text of the whole match."""
+    text_start: int
+    """Start of the whole match, where `text` starts in the searched string."""
+    regs: tuple[tuple[int, int], ...]
+    """Span of the match and of each group, or `(-1, -1)` if unset."""
+    groupindex: dict[str, int]
+    """Index of each named group, shared between snapshots of the same pattern."""
+
+    def __init__(self, match: MatchLike, offset: int = 0):
+        """Take a snapshot of a match.
+
+        Args:
+            match: Match, or another snapshot.
+            offset: Offset to add to spans, such as the start of a chunk in a stream.
+        """
+        self.text = match.group()  # type: ignore
+        self.text_start = match.start() + offset
+        self.regs = (
+            match.regs
+            if not offset
+            else tuple(
+                (start + offset, end + offset) if start >= 0 else (start, end)
+                for start, end in match.regs
+            )
+        )
+        self.groupindex = (
+            match.groupindex
+            if isinstance(match, MatchSnapshot)
+            else get_groupindex(match.re)
+        )
+
+    def __getstate__(self) -> tuple[Any, ...]:
+        return (self.text, self.text_start, self.regs, self.groupindex)
+
+    def __setstate__(self, state: tuple[Any, ...]):
+        self.text, self.text_start, self.regs, self.groupindex = state
+
+    def span(self, group: int | str = 0) -> tuple[int, int]:
+        """Get the span of a group."""
+        return self.regs[self.groupindex.get(group, group)]  # type: ignore
+
+    def start(self, group: int | str = 0) -> int:
+        """Get the start of a group."""
+        return self.span(group)[0]
+
+    def end(self, group: int | str = 0) -> int:
+        """Get the end of a group."""
+        return self.span(group)[1]
+
+    def group(self, group: int | str = 0) -> str | None:
+        """Get the text of a group, or `None` if it didn't participate."""
+        start, end = self.span(group)
+        if start < 0:
+            return None
+        return self.text[start - self.text_start : end - self.text_start]
+
+    def groups(self) -> tuple[str | None, ...]:
+        """Get the text of each group."""
+        return tuple(self.group(i) for i in range(1, len(self.regs)))
+
+    def groupdict(self) -> dict[str, str | None]:
+        """Get the text of each named group."""
+        return {name: self.group(name) for name in self.groupindex}
+
+    def __getitem__(self, group: int | str) -> str | None:
+        return self.group(group)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} span={self.span()}, match={self.text!r}>"
+
+
+MatchLike = Match[str] | MatchSnapshot
+"""Match, or a snapshot of one."""
+
+
+@cache
+def get_groupindex(pattern: Pattern[str]) -> dict[str, int]:
+    """Get the index of each named group of a pattern, once per pattern."""
+    return dict(pattern.groupindex)
+
+
+def snapshot(value: Any) -> Any:
+    """Replace matches with snapshots, including in lists, tuples, and dicts.
+
+    Subclasses of lists, tuples, and dicts, such as named tuples, are replaced by
+    plain ones, which compare equal to them.
+    """
+    if isinstance(value, Match):
+        return MatchSnapshot(value)
+    if isinstance(value, list):
+        return [snapshot(v) for v in value]  # type: ignore
+    if isinstance(value, tuple):
+        return tuple(snapshot(v) for v in value)  # type: ignore
+    if isinstance(value, dict):
+        return {k: snapshot(v) for k, v in value.items()}  # type: ignore
+    return value
+
+
+def check_match(match: MatchLike, other: MatchLike) -> bool:
+    """Check whether matches, or snapshots of them, have the same groups."""
+    return (
+        match.group() == other.group()
+        and match.groups() == other.groups()
+        and match.groupdict() == other.groupdict()
+    )
@@ -0,0 +1,443 @@
+"""Profile compiled regex patterns and guard against runaway matching."""
+
+from __future__ import annotations
+
+import signal
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from math import inf, log
+from multiprocessing import get_context
+from multiprocessing.connection import Connection
+from os import environ
+from re import DOTALL, NOFLAG, VERBOSE, Pattern, RegexFlag, error, purge
+from re import compile as re_compile
+from threading import current_thread, main_thread
+from time import perf_counter
+from typing import Any, NamedTuple, Self
+
+from advent23.matches import MatchLike, snapshot
+
+MATCH_METHODS = ("match", "fullmatch", "search")
+"""Pattern methods to profile."""
+SUPERLINEAR = 1.5
+"""Scaling exponent of match time with input length above which it's super-linear."""
+MATCH_TIMEOUT = float(environ.get("ADVENT23_MATCH_TIMEOUT", "0")) or None
+"""Seconds a match may take when profiling. Set `ADVENT23_MATCH_TIMEOUT` to limit it."""
+TOKEN = re_compile(
+    r"""
+    (?P<escape>\\(?:\d+|x[\da-fA-F]{2}|u[\da-fA-F]{4}|U[\da-fA-F]{8}|N\{[^}]*\}|.))
+    |(?P<set>\[\^?\]?(?:\\.|[^\]\\])*\])
+    |(?P<repeat>(?:[*+?]|\{\d*(?:,\d*)?\})[?+]?)
+    |(?P<special>\(\?(?:\#[^)]*|P=\w+|[aiLmsux]+)\))
+    |(?P<open>\((?:\?(?::|P<\w+>|[=!>]|<[=!]|\(\w+\)|[aiLmsux-]+:))?)
+    |(?P<close>\))
+    |(?P<alternate>\|)
+    |(?P<atom>.)
+    """,
+    VERBOSE | DOTALL,
+)
+"""Token of a regex pattern, named by its kind."""
+INLINE_VERBOSE = re_compile(r"^\(\?[aiLmsu]*x")
+"""Inline verbose flag at the start of a pattern."""
+
+
+class Token(NamedTuple):
+    """Token of a regex pattern."""
+
+    kind: str
+    """Kind of token, a group name in `TOKEN`."""
+    text: str
+    """Text of the token."""
+
+
+class Group(NamedTuple):
+    """Group in a regex pattern."""
+
+    opener: str
+    """Opening text of the group, such as `(?:`."""
+    nodes: list[Token | Group]
+    """Tokens and groups in the group."""
+
+
+ANY_ALTERNATIVES = (
+    [Token("atom", "."), Token("alternate", "|"), Token("escape", r"\n")],
+    [Token("escape", r"\n"), Token("alternate", "|"), Token("atom", ".")],
+)
+"""Contents of non-capturing groups that match any character, including newlines."""
+DOTALL_ANY = Group("(?s:", [Token("atom", ".")])
+"""Any character, including newlines, without alternation."""
+REPEATABLE = {"atom", "escape", "set"}
+"""Kinds of tokens that may be repeated on their own."""
+
+
+def optimize_pattern(pattern: str, flags: RegexFlag = NOFLAG) -> str:
+    r"""Rewrite a pattern into an equivalent one that matches faster.
+
+    Non-capturing alternations of any character, `(?:.|\n)`, become `(?s:.)`, which
+    the engine matches without branching, so that a repeat of it runs to the end of
+    input at once. Non-capturing groups that don't change how their contents match,
+    such as those nested by `GroupStringer`, are removed.
+
+    Verbose patterns are left as they are, as is any pattern whose rewrite doesn't
+    tokenize the same or doesn't compile, such as when removing a group would join a
+    backreference to a following digit.
+
+    Args:
+        pattern: Pattern to optimize.
+        flags: Flags that the pattern will be compiled with.
+    """
+    if flags & VERBOSE or INLINE_VERBOSE.match(pattern):
+        return pattern
+    try:
+        tokens = simplify(nest(tokenize(pattern)))
+    except ValueError:
+        return pattern
+    expected = list(flatten(tokens))
+    optimized = "".join(token.text for token in expected)
+    if list(tokenize(optimized)) != expected:
+        return pattern
+    try:
+        re_compile(optimized, flags)
+    except error:
+        return pattern
+    return optimized
+
+
+def tokenize(pattern: str) -> Iterator[Token]:
+    """Split a pattern into tokens."""
+    for match in TOKEN.finditer(pattern):
+        yield Token(match.lastgroup or "", match.group())
+
+
+def nest(tokens: Iterator[Token], opener: str = "") -> list[Token | Group]:
+    """Nest tokens into the groups that contain them."""
+    nodes: list[Token | Group] = []
+    for token in tokens:
+        if token.kind == "open":
+            nodes.append(Group(token.text, nest(tokens, token.text)))
+        elif token.kind == "close":
+            if not opener:
+                raise ValueError("Unbalanced parenthesis.")
+            return nodes
+        else:
+            nodes.append(token)
+    if opener:
+        raise ValueError("Unbalanced parenthesis.")
+    return nodes
+
+
+def simplify(nodes: list[Token | Group]) -> list[Token | Group]:
+    """Rewrite alternations of any character and remove redundant groups."""
+    simplified: list[Token | Group] = []
+    for i, node in enumerate(nodes):
+        if isinstance(node, Token):
+            simplified.append(node)
+            continue
+        children = simplify(node.nodes)
+        if node.opener != "(?:":
+            simplified.append(Group(node.opener, children))
+        elif children in ANY_ALTERNATIVES:
+            simplified.append(DOTALL_ANY)
+        elif any(isinstance(c, Token) and c.kind == "alternate" for c in children):
+            simplified.append(Group(node.opener, children))
+        elif not (
+            i + 1 < len(nodes)
+            and isinstance(repeat := nodes[i + 1], Token)
+            and repeat.kind == "repeat"
+        ):
+            simplified.extend(children)
+        elif len(children) == 1 and (
+            child.kind in REPEATABLE
+            if isinstance(child := children[0], Token)
+            else not child.opener.startswith(("(?=", "(?!", "(?<"))
+        ):
+            simplified.append(child)
+        else:
+            simplified.append(Group(node.opener, children))
+    return simplified
+
+
+def flatten(nodes: Iterable[Token | Group]) -> Iterator[Token]:
+    """Flatten groups back into tokens."""
+    for node in nodes:
+        if isinstance(node, Token):
+            yield node
+            continue
+        yield Token("open", node.opener)
+        yield from flatten(node.nodes)
+        yield Token("close", ")")
+
+
+@dataclass
+class PatternProfile:
+    """Timings of a compiled pattern against growing prefixes of an input."""
+
+    pattern: str
+    """Pattern that was profiled."""
+    compile_time: float
+    """Seconds taken to compile the pattern."""
+    sizes: list[int]
+    """Lengths of input prefixes that the pattern was matched against."""
+    times: dict[str, list[float]] = field(default_factory=dict)
+    """Seconds taken by each method for each prefix, or `inf` if it timed out."""
+
+    @property
+    def exponents(self) -> dict[str, float]:
+        """Scaling exponent of match time with input length, for each method."""
+        return {
+            method: get_scaling_exponent(self.sizes, times)
+            for method, times in self.times.items()
+        }
+
+    @property
+    def superlinear(self) -> list[str]:
+        """Methods whose match time scales super-linearly with input length."""
+        return [m for m, exp in self.exponents.items() if exp > SUPERLINEAR]
+
+
+def profile_pattern(
+    pattern: Pattern[str],
+    inp: str,
+    methods: Sequence[str] = MATCH_METHODS,
+    steps: int = 4,
+    repeat: int = 5,
+    timeout: float | None = MATCH_TIMEOUT,
+) -> PatternProfile:
+    """Profile a pattern against prefixes of an input, doubling in length.
+
+    Args:
+        pattern: Pattern to profile.
+        inp: Input to match against.
+        methods: Pattern methods to profile.
+        steps: Number of prefixes, the longest being the whole input.
+        repeat: Number of timed runs for each prefix, taking the fastest.
+        timeout: If given, seconds a match may take before the method is abandoned.
+    """
+    purge()
+    start = perf_counter()
+    re_compile(pattern.pattern, pattern.flags)
+    compile_time = perf_counter() - start
+    sizes = sorted({size for step in range(steps) if (size := len(inp) >> step)})
+    profile = PatternProfile(pattern.pattern, compile_time, sizes)
+    for method in methods:
+        times = profile.times[method] = []
+        for size in sizes:
+            prefix = inp[:size]
+            try:
+                times.append(
+                    min(
+                        timed(guard, getattr(pattern, method), prefix, timeout=timeout)
+                        for _ in range(repeat)
+                    )
+                )
+            except TimeoutError:
+                times.append(inf)
+                break
+    return profile
+
+
+def get_scaling_exponent(sizes: Sequence[int], times: Sequence[float]) -> float:
+    """Get the least-squares slope of log time against log input length."""
+    if inf in times:
+        return inf
+    points = [
+        (log(size), log(max(time, 1e-9)))
+        for size, time in zip(sizes, times, strict=True)
+    ]
+    if len(points) < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / sum(
+        (x - mean_x) ** 2 for x, _ in points
+    )
+
+
+def timed(f: Callable[..., Any], *args: Any, **kwds: Any) -> float:
+    """Get the seconds taken to call a function."""
+    start = perf_counter()
+    f(*args, **kwds)
+    return perf_counter() - start
+
+
+@dataclass(frozen=True)
+class GuardedPattern:
+    """Compiled pattern whose matching methods raise `TimeoutError` after a timeout.
+
+    Off the main thread, or where there are no interval timers, matches are found in a
+    separate process and returned as snapshots. Module-level functions of `re` only
+    accept compiled patterns, so use the methods of this one, or `compiled`, instead.
+    """
+
+    compiled: Pattern[str]
+    """Compiled pattern."""
+    timeout: float
+    """Seconds a match may take."""
+
+    @property
+    def pattern(self) -> str:
+        """Pattern string."""
+        return self.compiled.pattern
+
+    @property
+    def flags(self) -> int:
+        """Regex flags."""
+        return self.compiled.flags
+
+    @property
+    def groups(self) -> int:
+        """Number of capturing groups."""
+        return self.compiled.groups
+
+    @property
+    def groupindex(self) -> Mapping[str, int]:
+        """Index of each named group."""
+        return self.compiled.groupindex
+
+    def match(self, *args: Any) -> MatchLike | None:
+        return guard(self.compiled.match, *args, timeout=self.timeout)
+
+    def fullmatch(self, *args: Any) -> MatchLike | None:
+        return guard(self.compiled.fullmatch, *args, timeout=self.timeout)
+
+    def search(self, *args: Any) -> MatchLike | None:
+        return guard(self.compiled.search, *args, timeout=self.timeout)
+
+    def findall(self, *args: Any) -> list[Any]:
+        return guard(self.compiled.findall, *args, timeout=self.timeout)
+
+    def finditer(self, *args: Any) -> Iterator[MatchLike]:
+        """Find all matches within the timeout, then iterate over them."""
+        return iter(guard(self.compiled.finditer, *args, timeout=self.timeout))
+
+    def split(self, *args: Any) -> list[str | Any]:
+        return guard(self.compiled.split, *args, timeout=self.timeout)
+
+    def sub(self, *args: Any) -> str:
+        return guard(self.compiled.sub, *args, timeout=self.timeout)
+
+    def subn(self, *args: Any) -> tuple[str, int]:
+        return guard(self.compiled.subn, *args, timeout=self.timeout)
+
+    def __reduce__(self) -> tuple[type[Self], tuple[Pattern[str], float]]:
+        return type(self), (self.compiled, self.timeout)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> Self:
+        return self
+
+
+def guard(method: Callable[..., Any], *args: Any, timeout: float | None) -> Any:
+    """Call a method of a compiled pattern, raising `TimeoutError` if it takes too long.
+
+    The regex engine checks for signals while matching, so on platforms with interval
+    timers a match in the main thread is interrupted by an alarm. Elsewhere, the match
+    is found in a separate process that is killed after the timeout. Iterators of
+    matches are consumed within the timeout.
+
+    Args:
+        method: Bound method of a compiled pattern, such as `pattern.search`.
+        args: Arguments to the method.
+        timeout: Seconds the match may take, or `None` for no timeout.
+    """
+    if not timeout:
+        return method(*args)
+    if hasattr(signal, "setitimer") and current_thread() is main_thread():
+        return guard_with_alarm(method, *args, timeout=timeout)
+    return guard_with_process(method, *args, timeout=timeout)
+
+
+def guard_with_alarm(method: Callable[..., Any], *args: Any, timeout: float) -> Any:
+    """Interrupt a method of a compiled pattern with an alarm signal after a timeout.
+
+    An interval timer that is already set is paused for the duration of the call, then
+    restored, firing right away if it would have fired during the call.
+    """
+
+    def interrupt(*_):
+        raise TimeoutError(f"Match took over {timeout} s.")
+
+    previous = signal.signal(signal.SIGALRM, interrupt)
+    outer, interval = signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = perf_counter()
+    try:
+        return consume(method(*args))
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+        if outer:
+            remaining = max(outer - (perf_counter() - start), MIN_DELAY)
+            signal.setitimer(signal.ITIMER_REAL, remaining, interval)
+
+
+def guard_with_process(method: Callable[..., Any], *args: Any, timeout: float) -> Any:
+    """Call a method of a compiled pattern in a process killed after a timeout.
+
+    Processes are kept for later calls unless killed, even if the call raised, such as
+    when its arguments couldn't be pickled. Matches are returned as snapshots, since
+    they can't be pickled.
+    """
+    pattern: Pattern[str] = method.__self__  # type: ignore
+    try:
+        matcher = IDLE_MATCHERS.pop()
+    except IndexError:
+        matcher = Matcher()
+    try:
+        return matcher.call(pattern, method.__name__, args, timeout)
+    finally:
+        if matcher.proc.is_alive():
+            IDLE_MATCHERS.append(matcher)
+
+
+class Matcher:
+    """Process that calls methods of compiled patterns sent to it."""
+
+    def __init__(self):
+        ctx = get_context("spawn")
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=serve_matches, args=(child,), daemon=True)
+        self.proc.start()
+        child.close()
+
+    def call(
+        self, pattern: Pattern[str], method: str, args: tuple[Any, ...], timeout: float
+    ) -> Any:
+        """Call a method of a compiled pattern, killing this process after a timeout.
+
+        Raises:
+            TimeoutError: If the call took too long, after which this process is dead.
+        """
+        self.conn.send((pattern.pattern, pattern.flags, method, args))
+        if not self.conn.poll(timeout):
+            self.proc.kill()
+            self.proc.join()
+            self.conn.close()
+            raise TimeoutError(f"Match took over {timeout} s.")
+        status, result = self.conn.recv()
+        if status == "error":
+            raise result
+        return result
+
+
+IDLE_MATCHERS: list[Matcher] = []
+"""Processes ready to match in, reused between guarded matches off the main thread."""
+MIN_DELAY = 1e-6
+"""Shortest delay of a restored interval timer, so that setting it doesn't clear it."""
+
+
+def serve_matches(conn: Connection):
+    """Call methods of compiled patterns received over a connection, sending results."""
+    while task := conn.recv():
+        pattern, flags, method, args = task
+        try:
+            result = snapshot(
+                consume(getattr(re_compile(pattern, flags), method)(*args))
+            )
+        except Exception as exc:  # noqa: BLE001
+            conn.send(("error", exc))
+            continue
+        conn.send(("ok", result))
+
+
+def consume(result: Any) -> Any:
+    """Consume iterators, such as of matches, so that matching happens right away."""
+    return list(result) if isinstance(result, Iterator) else result
@@ -0,0 +1,89 @@
+"""Scratchcards, scored and copied all at once, for day 4."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property
+from re import MULTILINE, compile
+
+import numpy as np
+from numpy.typing import NDArray
+
+LABEL = compile(r"^Card\s+\d+:", flags=MULTILINE)
+"""Label of each card."""
+WORD = 64
+"""Bits in each word of a bitmask."""
+
+
+@dataclass(frozen=True)
+class Scratchcards:
+    """Winning and drawn numbers of scratchcards, a row per card."""
+
+    winning: NDArray[np.int64]
+    """Winning numbers of each card."""
+    drawn: NDArray[np.int64]
+    """Numbers drawn on each card."""
+
+    @cached_property
+    def matches(self) -> NDArray[np.int64]:
+        """Number of distinct drawn numbers on each card that are winning numbers.
+
+        Winning numbers of each card are packed into a bitmask of 64-bit words, and
+        drawn numbers are looked up in it, so each number is visited once. Numbers drawn
+        more than once on a card only match once.
+        """
+        cards = np.arange(len(self.winning))[:, None]
+        largest = max(int(self.winning.max(initial=0)), int(self.drawn.max(initial=0)))
+        masks = np.zeros((len(self.winning), largest // WORD + 1), dtype=np.uint64)
+        np.bitwise_or.at(
+            masks,
+            (cards, self.winning // WORD),
+            np.left_shift(np.uint64(1), (self.winning % WORD).astype(np.uint64)),
+        )
+        drawn = np.sort(self.drawn, axis=1)
+        bits = masks[cards, drawn // WORD] >> (drawn % WORD).astype(np.uint64)
+        found = (bits & np.uint64(1)).astype(np.bool_)
+        found[:, 1:] &= drawn[:, 1:] != drawn[:, :-1]
+        return found.sum(axis=1, dtype=np.int64)
+
+    @property
+    def points(self) -> NDArray[np.int64]:
+        """Points of each card, doubling for each match after the first."""
+        return np.where(self.matches > 0, 1 << np.maximum(self.matches - 1, 0), 0)
+
+    def copies(self) -> NDArray[np.int64]:
+        """Count copies of each card after cards win copies of the cards after them.
+
+        Each card adds its copies to a range of later cards, tracked in a difference
+        array so that each range costs two updates. A card's copies are only known
+        once earlier cards are counted, so cards are counted in turn, in a single
+        pass.
+        """
+        matches = self.matches.tolist()
+        count = len(matches)
+        copies = [0] * count
+        changes = [0] * (count + 1)
+        won = 0
+        for card, wins in enumerate(matches):
+            won += changes[card]
+            copies[card] = current = won + 1
+            if wins:
+                changes[card + 1] += current
+                changes[min(card + 1 + wins, count)] -= current
+        return np.array(copies, dtype=np.int64)
+
+
+def parse_cards(text: str) -> Scratchcards:
+    """Parse scratchcards with the same number of winning and drawn numbers each."""
+    body = LABEL.sub("", text)
+    widths = {
+        tuple(len(part.split()) for part in line.split("|"))
+        for line in body.splitlines()
+        if line.strip()
+    }
+    if len(widths) != 1 or len(width := widths.pop()) != 2:
+        raise ValueError("Cards must have the same number of numbers.")
+    winning = width[0]
+    numbers = np.array(body.replace("|", " ").split(), dtype=np.int64)
+    numbers = numbers.reshape(len(LABEL.findall(text)), -1)
+    return Scratchcards(numbers[:, :winning], numbers[:, winning:])
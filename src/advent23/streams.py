@@ -0,0 +1,92 @@
+"""Find matches in inputs read in chunks, holding only a bounded part in memory."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import ExitStack
+from pathlib import Path
+from re import Pattern
+from typing import TYPE_CHECKING, TextIO
+
+from advent23.matches import MatchSnapshot
+
+if TYPE_CHECKING:
+    from advent23.patterns import GuardedPattern
+
+CHUNK_SIZE = 2**16
+"""Characters to read at a time."""
+MAX_LEN = 2**12
+"""Default length of the longest match, including text examined by lookarounds."""
+
+
+class StreamMatch(MatchSnapshot):
+    """Match found in a stream, with spans measured from the start of the stream.
+
+    Holds the matched text rather than the chunk it was found in, so keeping matches
+    doesn't keep chunks in memory.
+    """
+
+    __slots__ = ()
+
+
+def finditer_stream(
+    pattern: Pattern[str] | GuardedPattern,
+    source: str | Path | TextIO,
+    chunk_size: int = CHUNK_SIZE,
+    max_len: int = MAX_LEN,
+) -> Iterator[StreamMatch]:
+    """Find matches in an input read in chunks, as `finditer` would in the whole input.
+
+    Matches starting more than `max_len` characters before the end of what has been
+    read so far are final, since no match is longer than that, so the end of what has
+    been read, where `$` would match, is never examined for them. Other matches are
+    found again once more has been read. Text after final matches is carried over to
+    the next chunk, along with `max_len` characters before it so that lookbehinds and
+    `^` see the same context as they would in the whole input.
+
+    Args:
+        pattern: Compiled pattern.
+        source: Path to an input, or a file opened in text mode. Line endings of paths
+            are normalized as `advent23.inputs.load` does.
+        chunk_size: Characters to read at a time.
+        max_len: Length of the longest match, including text examined by lookarounds.
+
+    Raises:
+        ValueError: If a match longer than `max_len` is found before the end of input,
+            since it may have been cut short where reading stopped.
+    """
+    with ExitStack() as stack:
+        file = (
+            stack.enter_context(Path(source).open(encoding="utf-8"))
+            if isinstance(source, str | Path)
+            else source
+        )
+        buffer = ""
+        offset = 0
+        pos = 0
+        empty = -1
+        while True:
+            chunk = file.read(chunk_size)
+            buffer += chunk
+            safe = len(buffer) - max_len if chunk else len(buffer) + 1
+            for match in pattern.finditer(buffer, pos):
+                start, end = match.span()
+                if start == end == empty - offset:
+                    continue
+                if start >= safe:
+                    break
+                if chunk and end - start > max_len:
+                    raise ValueError(
+                        f"Match at {start + offset} is longer than {max_len} chars."
+                    )
+                yield StreamMatch(match, offset)
+                pos = end
+                empty = end + offset if start == end else -1
+            if not chunk:
+                return
+            # No match starts before `safe` other than those found
+            pos = max(pos, safe)
+            keep = max(pos - max_len, 0)
+            buffer = buffer[keep:]
+            offset += keep
+            pos -= keep
@@ -5,16 +5,25 @@ from __future__ import annotations
 from collections.abc import Callable, Iterator, Mapping, MutableMapping
 from copy import deepcopy
 from dataclasses import dataclass, field
+from functools import cache
+from pathlib import Path
 from re import NOFLAG, Match, Pattern, RegexFlag, compile
 from string import Template
 from textwrap import fill
+from time import perf_counter
 from types import SimpleNamespace
-from typing import Any, Self
-
-from IPython.core.display import Markdown
-from IPython.display import display
+from typing import Any, NamedTuple, Self, TextIO, overload
+from weakref import ReferenceType, ref
 
 from advent23 import CheckDict, disp_name, make_readable
+from advent23.matches import MatchSnapshot, check_match
+from advent23.patterns import (
+    GuardedPattern,
+    PatternProfile,
+    optimize_pattern,
+    profile_pattern,
+)
+from advent23.streams import CHUNK_SIZE, MAX_LEN, StreamMatch, finditer_stream
 
 ANY = r"(?:.|\n)"
 """Any character, including newlines."""
@@ -25,66 +34,288 @@ class Stringer(MutableMapping[str, Self]):
         """Recursive string substitution template."""
         super().__init__()
         self._ns = SimpleNamespace()
+        self._parents: dict[int, ReferenceType[Stringer]] = {}
+        self._cache: dict[tuple[Any, ...], Any] = {}
+        self._shared: set[str] = set()
         for k, v in (dict(root=root, any=ANY) | kwds).items():
             self[k] = v if isinstance(v, type(self) | str) else type(self)(**v)
         self._flags = NOFLAG
 
-    def compile(self, quiet: bool = False, flags: RegexFlag = NOFLAG) -> Pattern[str]:  # noqa: A003
-        """Substitute values into root `r` and get compiled regex pattern."""
-        return compile(self.sub(quiet), flags=self._flags | flags)
+    @overload
+    def compile(  # noqa: A003
+        self,
+        quiet: bool = False,
+        flags: RegexFlag = NOFLAG,
+        timeout: None = None,
+        optimize: bool = True,
+    ) -> Pattern[str]: ...
+
+    @overload
+    def compile(  # noqa: A003
+        self, quiet: bool, flags: RegexFlag, timeout: float, optimize: bool = True
+    ) -> Pattern[str] | GuardedPattern: ...
+
+    @overload
+    def compile(  # noqa: A003
+        self,
+        quiet: bool = False,
+        flags: RegexFlag = NOFLAG,
+        *,
+        timeout: float,
+        optimize: bool = True,
+    ) -> Pattern[str] | GuardedPattern: ...
+
+    def compile(  # noqa: A003
+        self,
+        quiet: bool = False,
+        flags: RegexFlag = NOFLAG,
+        timeout: float | None = None,
+        optimize: bool = True,
+    ) -> Pattern[str] | GuardedPattern:
+        """Substitute values into root `r` and get compiled regex pattern.
+
+        Args:
+            quiet: Leave unresolved placeholders in place.
+            flags: Regex flags in addition to those set on this Stringer.
+            timeout: If given, seconds a match may take before raising `TimeoutError`,
+                returning a guarded pattern. A timeout of zero disables the guard.
+            optimize: Rewrite the pattern into an equivalent one that matches faster.
+        """
+        flags = self._flags | flags
+        key = ("compile", quiet, flags, optimize)
+        if (pattern := self._cache.get(key)) is None:
+            node = self.sub(quiet)
+            pattern = self._cache[key] = compile(
+                optimize_pattern(node, flags) if optimize else node, flags=flags
+            )
+        return GuardedPattern(pattern, timeout) if timeout else pattern
+
+    def profile(self, inp: str, **kwds: Any) -> PatternProfile:
+        """Profile the compiled pattern against growing prefixes of an input.
+
+        Args:
+            inp: Input to match against.
+            kwds: Arguments to `profile_pattern`.
+        """
+        return profile_pattern(self.compile(), inp, **kwds)
+
+    def finditer_stream(
+        self,
+        source: str | Path | TextIO,
+        chunk_size: int = CHUNK_SIZE,
+        max_len: int = MAX_LEN,
+        **kwds: Any,
+    ) -> Iterator[StreamMatch]:
+        """Find matches in an input read in chunks, holding a bounded part in memory.
+
+        Args:
+            source: Path to an input, or a file opened in text mode.
+            chunk_size: Characters to read at a time.
+            max_len: Length of the longest match, including text lookarounds examine.
+            kwds: Arguments to `compile`.
+        """
+        return finditer_stream(self.compile(**kwds), source, chunk_size, max_len)
 
     def set_flags(self, flags: RegexFlag) -> Self:
         """Set regex flags for pattern compilation."""
+        self._detach_parents()
         self._flags = flags
         for k, v in self.items():
             if isinstance(v, type(self)):
                 self[k].set_flags(flags)
+        self.invalidate()
         return self
 
     def sub(self, quiet: bool = False, final: bool = True) -> str:
         """Substitute values into root `r`."""
-        root = self.root
-        node: str = root.sub(quiet) if isinstance(root, type(self)) else root
-        while node != (
-            node := self.get_tsub(node, quiet)({
-                name: child.sub(quiet, final=False)
-                if isinstance(child, Stringer)
-                else child
-                for name, child in self.items()
-            })
-        ):
-            pass
+        key = ("sub", quiet, final)
+        if (node := self._cache.get(key)) is None:
+            node = self._cache[key] = self._sub(quiet, final)
+        return node
+
+    def _sub(self, quiet: bool, final: bool) -> str:
+        """Substitute values into root `r`, bypassing the cache.
+
+        Expands each value once, resolving its placeholders depth-first so that values
+        are expanded in topological order. Child Stringers are expanded in their own
+        namespace, then any placeholders they leave unresolved in `quiet` mode are
+        resolved in this one.
+        """
+        items = self._ns.__dict__
+        expanded: dict[str, str] = {}
+        path: list[str] = []
+
+        def expand(name: str) -> str:
+            if (text := expanded.get(name)) is not None:
+                return text
+            if name in path:
+                cycle = " -> ".join([*path[path.index(name) :], name])
+                raise ValueError(f"Substitution cycle: {cycle}")
+            value = items[name]
+            path.append(name)
+            expanded[name] = text = "".join([
+                seg if isinstance(seg, str) else resolve(seg)
+                for seg in parse(
+                    value.sub(quiet, final=False)
+                    if isinstance(value, Stringer)
+                    else value
+                )
+            ])
+            path.pop()
+            return text
+
+        def resolve(placeholder: Placeholder) -> str:
+            if placeholder.name in items:
+                return expand(placeholder.name)
+            if quiet:
+                return placeholder.text
+            if not placeholder.name:
+                raise ValueError(
+                    f"Invalid placeholder {placeholder.text!r} in {path[-1]!r}."
+                )
+            raise KeyError(placeholder.name)
+
+        node = expand("root")
         return node.replace("$$", "$") if final else node
 
-    def get_tsub(self, string: str, quiet: bool) -> Callable[[Mapping[str, str]], str]:
-        """Get a template substituter that raises exceptions or passes silently."""
-        t = Template(string.replace("$$", "$$$$"))
-        return t.safe_substitute if quiet else t.substitute
-
     def __repr__(self) -> str:
-        args = ", ".join([f"{k}={v!r}" for k, v in self.items()])
+        args = ", ".join([f"{k}={v!r}" for k, v in self._ns.__dict__.items()])
         return fill(f"{Stringer.__name__}({args})", width=88, subsequent_indent=" " * 4)
 
+    def invalidate(self):
+        """Clear cached substitutions of this Stringer and every Stringer containing it.
+
+        Called whenever a Stringer changes, so that none of its ancestors substitute or
+        compile stale values.
+        """
+        self._cache.clear()
+        for parent in [p for r in self._parents.values() if (p := r())]:
+            parent.invalidate()
+
+    def share(self) -> Self:
+        """Get a copy that shares child Stringers with this one until either changes.
+
+        The copy shares each child with this Stringer, copying it the first time it's
+        accessed through the copy. A shared child that is about to change through this
+        Stringer, or through any reference to it, is first replaced by a copy in the
+        Stringers sharing it. So changes through either are never observed by the
+        other, as if the copy were deep, but only the path to changed nodes is copied.
+        """
+        copy = type(self).__new__(type(self))
+        state = {k: v for k, v in self.__getstate__().items() if k != "_ns"}
+        copy.__setstate__({
+            **deepcopy(state),
+            "_ns": SimpleNamespace(**self._ns.__dict__),
+            "_cache": dict(self._cache),
+            "_shared": {
+                k for k, v in self._ns.__dict__.items() if isinstance(v, Stringer)
+            },
+        })
+        return copy
+
+    def link(self, parent: Stringer):
+        """Invalidate and detach from a Stringer whenever this one changes."""
+        self._parents[id(parent)] = ref(parent)
+
+    def unlink(self, parent: Stringer):
+        """Stop invalidating and detaching from a Stringer that no longer contains it."""
+        self._parents.pop(id(parent), None)
+
+    def detach(self, child: Stringer):
+        """Prepare for a child to change, replacing it by a copy where it's shared.
+
+        If this Stringer doesn't share the child, its contents are about to change with
+        the child, so it's also detached from its own parents.
+        """
+        items = self._ns.__dict__
+        names = [k for k, v in items.items() if v is child]
+        if any(k not in self._shared for k in names):
+            self._detach_parents()
+        if shared := [k for k in names if k in self._shared]:
+            copy = child.share()
+            for k in shared:
+                items[k] = copy
+                self._shared.discard(k)
+            copy.link(self)
+            self._release(child)
+
+    def _detach_parents(self):
+        """Prepare for this Stringer to change, detaching it from its parents.
+
+        Detaching a parent may share this Stringer with new copies of that parent, which
+        are then detached in turn.
+        """
+        detached: set[int] = set()
+        while parents := [
+            p
+            for k, r in list(self._parents.items())
+            if k not in detached and (p := r())
+        ]:
+            for parent in parents:
+                detached.add(id(parent))
+                parent.detach(self)
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {
+            k: v
+            for k, v in self.__dict__.items()
+            if k not in {"_parents", "_cache", "_shared"}
+        }
+
+    def __setstate__(self, state: dict[str, Any]):
+        self.__dict__.update({"_cache": {}, "_shared": set()} | state)
+        self._parents = {}
+        for child in self._ns.__dict__.values():
+            if isinstance(child, Stringer):
+                child.link(self)
+
     def __setattr__(self, name: str, value):
         if "_" in name:
             return super().__setattr__(name, value)
-        self._ns.__setattr__(name, value)
+        self[name] = value
 
     def __getattr__(self, name: str):
         if name == "_ns":
             return super().__getattr__(name)  # type: ignore
-        return self._ns.__getattribute__(name)
+        return self[name]
 
     def __setitem__(self, key: str, value):
+        self._detach_parents()
+        old = self._ns.__dict__.get(key)
         self._ns.__setattr__(key, value)
+        self._shared.discard(key)
+        if isinstance(value, Stringer):
+            value.link(self)
+        self._release(old)
+        self.invalidate()
 
     def __getitem__(self, name: str):
-        return self._ns.__getattribute__(name)
+        child = self._ns.__getattribute__(name)
+        if name not in self._shared:
+            return child
+        copy = child.share()
+        self._ns.__setattr__(name, copy)
+        self._shared.discard(name)
+        copy.link(self)
+        self._release(child)
+        return copy
 
     def __delitem__(self, name: str):
         if name == "root":
             raise KeyError("Cannot delete root.")
+        self._detach_parents()
+        old = self._ns.__dict__.get(name)
         self._ns.__delattr__(name)
+        self._shared.discard(name)
+        self._release(old)
+        self.invalidate()
+
+    def _release(self, child: Any):
+        """Stop invalidating this Stringer when a former child is mutated."""
+        if isinstance(child, Stringer) and all(
+            v is not child for v in self._ns.__dict__.values()
+        ):
+            child.unlink(self)
 
     def __iter__(self) -> Iterator[Self | str]:  # type: ignore
         return iter(self._ns.__dict__)
@@ -96,7 +327,7 @@ class Stringer(MutableMapping[str, Self]):
         return self | other
 
     def __or__(self, other: Self | Mapping[str, Any]) -> Self:
-        return deepcopy(self).__ior__(other)
+        return self.share().__ior__(other)
 
     def __ior__(self, other: Self | Mapping[str, Any]) -> Self:
         self.update(other)
@@ -131,6 +362,39 @@ def group(
     return {name: GroupStringer(pat, name, **kwds)}
 
 
+class Placeholder(NamedTuple):
+    """Placeholder in a template."""
+
+    name: str
+    """Name to substitute, or empty if the placeholder is invalid."""
+    text: str
+    """Text of the placeholder, left in place if it can't be substituted."""
+
+
+@cache
+def parse(template: str) -> tuple[str | Placeholder, ...]:
+    """Parse a template into literal text and placeholders.
+
+    Escaped delimiters, `$$`, are kept as literal text. Invalid placeholders, such as a
+    lone `$`, get an empty name.
+    """
+    segments: list[str | Placeholder] = []
+    pos = 0
+    for match in Template.pattern.finditer(template):
+        if (start := match.start()) > pos:
+            segments.append(template[pos:start])
+        pos = match.end()
+        if match["escaped"] is not None:
+            segments.append("$$")
+            continue
+        segments.append(
+            Placeholder(match["named"] or match["braced"] or "", match.group())
+        )
+    if pos < len(template):
+        segments.append(template[pos:])
+    return tuple(segments)
+
+
 StringerCheck = Callable[[Stringer], Any]
 
 
@@ -139,6 +403,14 @@ class StringerChecker:
     chk: CheckDict
     stringer: Stringer = field(default_factory=Stringer)
     checks: dict[str, StringerCheck] = field(default_factory=dict)
+    inp: str | Mapping[str, str] | None = None
+    """Input that checks match against. Results are only reused if given."""
+    results: dict[str, tuple[tuple[Any, ...], Any]] = field(
+        default_factory=dict, repr=False
+    )
+    """Fingerprint and result of the latest run of each check."""
+    timings: dict[str, float] = field(default_factory=dict)
+    """Seconds taken by the latest run of each check, excluding reused results."""
 
     def __call__(self, stringer: Stringer, **kwds: StringerCheck) -> Stringer:
         """Run checks and return the `Stringer` that passed them.
@@ -148,8 +420,8 @@ class StringerChecker:
             disp: Whether to display the compiled pattern.
             kwds: Checks to add if existing checks pass.
         """
-        disp_name("stringer", stringer)
-        disp_name("pattern", stringer.compile())
+        self.chk.disp("stringer", stringer)
+        self.chk.disp("pattern", stringer.compile())
         for name in [n for n in self.checks if n not in kwds]:
             self.check(stringer, name, self.checks[name], update=False)
         for name in kwds:
@@ -161,17 +433,32 @@ class StringerChecker:
     def check(
         self, stringer: Stringer, name: str, check: StringerCheck, update: bool = True
     ):
-        try:
-            result = check(stringer)
-        except Exception:
-            display(Markdown(f'### "{make_readable(name)}" check raised exception'))
-            raise
+        from IPython.core.display import Markdown
+        from IPython.display import display
+
+        key = self.fingerprint(stringer, name, check)
+        if key is not None and (latest := self.results.get(name)) and latest[0] == key:
+            result = latest[1]
+        else:
+            start = perf_counter()
+            try:
+                result = check(stringer)
+            except Exception:
+                display(Markdown(f'### "{make_readable(name)}" check raised exception'))
+                raise
+            self.timings[name] = perf_counter() - start
+            if key is None:
+                self.results.pop(name, None)
+            else:
+                self.results[name] = (key, result)
         if update:
             self.chk[name] = result
             return
         if expected := self.chk.get(name):
             try:
-                if isinstance(result, Match) and isinstance(expected, Match):
+                if isinstance(result, Match | MatchSnapshot) and isinstance(
+                    expected, Match | MatchSnapshot
+                ):
                     assert check_match(result, expected)  # noqa: S101
                 else:
                     assert result == expected  # noqa: S101
@@ -181,10 +468,53 @@ class StringerChecker:
                 disp_name("Your answer", result)
                 raise
 
+    def fingerprint(
+        self, stringer: Stringer, name: str, check: StringerCheck
+    ) -> tuple[Any, ...] | None:
+        """Fingerprint the inputs of a check, which determine its result.
 
-def check_match(match: Match[str], other: Match[str]) -> bool:
-    return (
-        match.group() == other.group()
-        and match.groups() == other.groups()
-        and match.groupdict() == other.groupdict()
-    )
+        Checks are assumed to depend only on the compiled pattern and on `inp`, so a
+        check with the same fingerprint as its latest run is not run again. Without
+        `inp`, the input a check matches against is unknown, so checks always run.
+        """
+        if self.inp is None:
+            return None
+        pattern = stringer.compile()
+        inp = (
+            tuple((k, hash(v)) for k, v in self.inp.items())
+            if isinstance(self.inp, Mapping)
+            else hash(self.inp)
+        )
+        return (name, check, pattern.pattern, pattern.flags, inp)
+
+    def report(self) -> dict[str, float]:
+        """Display and return check timings, slowest first."""
+        timings = dict(sorted(self.timings.items(), key=lambda t: t[1], reverse=True))
+        self.chk.disp("check timings", timings)
+        return timings
+
+    def profile(self, **inputs: str) -> dict[str, PatternProfile]:
+        """Profile the current pattern against inputs, such as example and full inputs.
+
+        Displays the scaling exponent of each method with input length, and any
+        methods that scale super-linearly, which suggests catastrophic backtracking.
+
+        Args:
+            inputs: Inputs to profile against, by name.
+        """
+        profiles = {name: self.stringer.profile(inp) for name, inp in inputs.items()}
+        for name, profile in profiles.items():
+            self.chk.disp(
+                f"{name} profile",
+                {
+                    "compile": profile.compile_time,
+                    **{
+                        f"{method} at {profile.sizes[-1]}": times[-1]
+                        for method, times in profile.times.items()
+                    },
+                    "exponents": profile.exponents,
+                },
+            )
+            if profile.superlinear:
+                self.chk.disp(f"{name} super-linear", profile.superlinear)
+        return profiles
@@ -4,21 +4,43 @@ from __future__ import annotations
 
 from collections.abc import Iterator
 from dataclasses import dataclass
+from functools import cache, cached_property
+from hashlib import sha256
+from json import dumps, loads
+from os import environ, getpid
 from pathlib import Path
 from re import MULTILINE, compile
-from typing import Self
+from shutil import rmtree
+from typing import Any, Self
 
 from astroid import Assign, AssignName, Const, List, Uninferable, extract_node
 from astroid.exceptions import InferenceError
 from boilercore.notebooks.namespaces import get_nb_ns
 from nbformat import NO_CONVERT, reads
 
-from advent23 import EXAMPLES
+from advent23 import DISPLAY, EXAMPLES
 
 ATTEMPTS = Path("src/advent23")
 """Location of attempts."""
+CACHE = Path(".cache/advent23_tests")
+"""Location of persistent caches for tests."""
+# Nobody sees outputs of notebooks executed in tests, so don't render them
+environ.setdefault(DISPLAY, "headless")
+PROFILE = environ.get("ADVENT23_PROFILE", "")
+"""Set `ADVENT23_PROFILE` to profile notebooks executed for attempts.
+
+Set it to `cprofile` to also collect function call statistics. See
+`advent23_tests.profiling`.
+"""
 USERS = ("blake", "abdul", "brad", "together")
 """Users to test."""
+CHECKPOINTS: dict[tuple[str, str, str, str], dict[str, Any] | Exception] = {}
+"""Checkpoints from executed notebooks, or the exceptions they raised.
+
+Keyed by user, day, and hashes of the notebook contents and example inputs, so that
+each notebook is executed at most once per test session, and edited notebooks or
+examples are executed afresh.
+"""
 
 
 def walk_attempts(other_user: str = "") -> Iterator[Attempt]:
@@ -56,7 +78,7 @@ class Attempt:
         """Example input for this attempt."""
         return EXAMPLES[self.day].inp
 
-    @property
+    @cached_property
     def checks(self) -> list[str]:
         """Attempted checkpoints retrieved from the notebook's `chk` mapping.
 
@@ -69,26 +91,45 @@ class Attempt:
         """
         return [
             check
-            for check in get_attempted_checks(self.nb)
+            for check in get_cached_attempted_checks(self.nb)
             if check in (self.other.checks if self.other else EXAMPLES[self.day].chk)
         ]
 
-    @property
+    @cached_property
     def nb(self) -> str:
         """Jupyter notebook associated with this user's attempt."""
         path = ATTEMPTS / self.user / f"day{self.day}.ipynb"
         return path.read_text(encoding="utf-8") if path.exists() else ""
 
+    @cached_property
+    def key(self) -> tuple[str, str, str, str]:
+        """Key for checkpoints resulting from executing this attempt."""
+        return (
+            self.user,
+            self.day,
+            get_hash(self.nb),
+            get_hash(repr(sorted(self.inp.items()))),
+        )
+
+    def get_chk(self) -> dict[str, Any]:
+        """Get all checkpoints in this attempt, executing the notebook at most once.
+
+        The notebook should have `chk` and `inp` mappings. Exceptions raised while
+        executing the notebook are also cached, and raised again on later calls.
+        """
+        if (key := self.key) not in CHECKPOINTS:
+            CHECKPOINTS[key] = execute(self.nb, self.inp, self.get_id(""))
+        if isinstance(chk := CHECKPOINTS[key], Exception):
+            raise chk
+        return chk
+
     def get_answer(self, check: str):
         """Get the user's answer for a checkpoint in this attempt.
 
-        The notebook should have `chk` and `inp` mappings.
-
         Args:
             check: Checkpoint name.
         """
-        ns = get_nb_ns(nb=self.nb, params={"inp": self.inp}, attributes=["chk", "inp"])
-        return chk.get(check) if (chk := getattr(ns, "chk", None)) else None
+        return self.get_chk().get(check)
 
     def get_expected_answer(self, check: str):
         """Get the expected answer for a checkpoint.
@@ -116,6 +157,35 @@ class Attempt:
         return "_".join([p for p in (self.user, f"day{self.day}", check) if p])
 
 
+def execute(nb: str, inp: dict[str, str], name: str = "") -> dict[str, Any] | Exception:
+    """Execute a notebook and get its checkpoints, or the exception it raised.
+
+    If `PROFILE` is set, the notebook is instead executed cell by cell and profiled.
+
+    Args:
+        nb: Jupyter notebook contents.
+        inp: Inputs to pass to the notebook.
+        name: Name of the attempt, such as `blake_day05`, to file profiles under.
+    """
+    if PROFILE:
+        from advent23_tests.profiling import profile_notebook
+
+        profile = profile_notebook(nb, dict(inp), name or "attempt")
+        if profile.exception:
+            return profile.exception
+        return dict(chk) if (chk := profile.ns.get("chk")) else {}
+    try:
+        ns = get_nb_ns(nb=nb, params={"inp": inp}, attributes=["chk", "inp"])
+    except Exception as exc:  # noqa: BLE001
+        return exc
+    return dict(chk) if (chk := getattr(ns, "chk", None)) else {}
+
+
+def get_hash(text: str) -> str:
+    """Get a hash of some text, stable across sessions."""
+    return sha256(text.encode("utf-8")).hexdigest()
+
+
 CHECKS = compile(pattern=r'(?P<line>^chk\["(?P<check>[\w_]+)"\].+$)', flags=MULTILINE)
 """Find notebook-level assignments to a `chk` mapping.
 
@@ -132,6 +202,66 @@ CHECKS_REPL = r"\g<line>  #@"
 """Annotate checks for node extraction with `astroid`."""
 
 
+CHECKS_CACHE = CACHE / "checks" / get_hash(Path(__file__).read_text(encoding="utf-8"))
+"""Location of cached attempted checkpoints.
+
+Depends on the contents of this module, so changes to the heuristic used to find
+attempted checkpoints invalidate the cache. Caches for other contents are pruned.
+"""
+
+
+def get_cached_attempted_checks(nb: str) -> list[str]:
+    """Get names of attempted checkpoints, cached on disk by notebook contents.
+
+    Returns:
+        List of attempted checkpoints.
+
+    Args:
+        nb: Jupyter notebook contents.
+    """
+    prune_checks_cache()
+    path = CHECKS_CACHE / f"{get_hash(nb)}.json"
+    if path.exists():
+        return loads(path.read_text(encoding="utf-8"))
+    checks = get_attempted_checks(nb)
+    write_atomic(path, dumps(checks))
+    return checks
+
+
+@cache
+def prune_checks_cache():
+    """Remove cached attempted checkpoints that can no longer be used.
+
+    Removes checkpoints found by other contents of this module, and those found in
+    notebooks that no longer exist, such as earlier versions of edited notebooks.
+    """
+    if not CHECKS_CACHE.parent.exists():
+        return
+    for path in CHECKS_CACHE.parent.iterdir():
+        if path != CHECKS_CACHE:
+            rmtree(path, ignore_errors=True)
+    if not CHECKS_CACHE.exists():
+        return
+    current = {
+        get_hash(nb.read_text(encoding="utf-8")) for nb in ATTEMPTS.glob("*/day*.ipynb")
+    }
+    for path in CHECKS_CACHE.glob("*.json"):
+        if path.stem not in current:
+            path.unlink(missing_ok=True)
+
+
+def write_atomic(path: Path, text: str):
+    """Write text to a file, replacing it all at once so readers never see it partly.
+
+    Workers may write the same file concurrently, so each writes its own temporary file
+    first.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{getpid()}.tmp")
+    tmp.write_text(encoding="utf-8", data=text)
+    tmp.replace(path)
+
+
 def get_attempted_checks(nb: str) -> list[str]:
     """Get names of attempted checkpoints from notebook contents.
 
@@ -0,0 +1,185 @@
+"""Benchmarks."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass, field
+from json import dumps, loads
+from os import environ
+from pathlib import Path
+from subprocess import CalledProcessError, run
+from time import perf_counter
+from tracemalloc import get_traced_memory, start, stop
+from typing import Any
+
+from advent23 import get_inp
+from advent23_tests.attempts import CACHE, Attempt, walk_attempts, write_atomic
+from advent23_tests.profiling import execute_cells
+
+BENCHMARKS = environ.get("ADVENT23_BENCHMARKS", "")
+"""Set `ADVENT23_BENCHMARKS` to `full` to benchmark notebooks on full inputs."""
+THRESHOLD = float(environ.get("ADVENT23_BENCHMARK_THRESHOLD", "0.5"))
+"""Fraction by which a notebook may get slower than its baseline before failing."""
+FLOOR = float(environ.get("ADVENT23_BENCHMARK_FLOOR", "0.01"))
+"""Seconds by which a notebook may always get slower than its baseline.
+
+Timings of fast notebooks vary by more than `THRESHOLD` between runs.
+"""
+REPEAT = 3
+"""Number of timed runs of each notebook, after a warm-up run."""
+HISTORY = CACHE / "benchmarks"
+"""Location of benchmark results, one file per commit."""
+INPUT = Path("input")
+"""Full puzzle inputs."""
+
+
+@dataclass
+class Measurement:
+    """Measurement of a benchmark."""
+
+    time: float
+    """Best wall time over repeated runs, in seconds."""
+    peak: int = 0
+    """Peak memory allocated during a single run, in bytes, or `0` if not traced."""
+
+    def __str__(self) -> str:
+        if not self.peak:
+            return f"{self.time * 1e3:.3f} ms"
+        return f"{self.time * 1e3:.3f} ms, {self.peak / 2**10:.1f} KiB peak"
+
+    def get_throughput(self, size: int) -> float:
+        """Get throughput in MB/s, having processed `size` bytes in each run."""
+        return size / self.time / 1e6
+
+
+def measure(f: Callable[[], Any], repeat: int = 5, trace: bool = True) -> Measurement:
+    """Measure the best wall time and the peak memory of calling a function.
+
+    Peak memory is measured in a separate run, since tracing allocations slows down
+    execution considerably.
+
+    Args:
+        f: Function to measure.
+        repeat: Number of timed runs.
+        trace: Measure peak memory, which may take much longer than timed runs.
+    """
+    times: list[float] = []
+    for _ in range(repeat):
+        begin = perf_counter()
+        f()
+        times.append(perf_counter() - begin)
+    if not trace:
+        return Measurement(min(times))
+    start()
+    try:
+        f()
+        _, peak = get_traced_memory()
+    finally:
+        stop()
+    return Measurement(min(times), peak)
+
+
+@dataclass
+class NotebookRun:
+    """Benchmark of a notebook executed on full inputs."""
+
+    time: float = 0.0
+    """Best wall time of executing cells after the first, in seconds."""
+    peak: int = 0
+    """Peak memory allocated during a separate run, in bytes."""
+    cells: list[float] = field(default_factory=list)
+    """Best wall time of each code cell, in seconds."""
+    error: str = ""
+    """Exception raised by a cell, which stops execution, if any."""
+
+
+def walk_benchmarks() -> Iterator[Attempt]:
+    """Walk attempts that have full inputs."""
+    for att in walk_attempts():
+        if (INPUT / att.user / f"{att.day}.txt").exists():
+            yield att
+
+
+def benchmark_attempt(att: Attempt, repeat: int = REPEAT) -> NotebookRun:
+    """Benchmark an attempt's notebook on its user's full inputs.
+
+    The notebook is executed once to warm up imports and caches, then timed over
+    repeated runs, keeping the best time of each cell. The first cell only imports and
+    sets up, so it is left out of the total. The notebook is executed again tracing
+    allocations to find peak memory, since tracing slows execution considerably. Full
+    inputs are injected after the first cell if no cell is tagged `parameters`, since
+    that cell loads example inputs.
+
+    Args:
+        att: Attempt to benchmark.
+        repeat: Number of timed runs.
+    """
+    params = {"inp": get_inp(att.day, att.user)}
+    if error := execute_cells(att.nb, params, after_first=True).error:
+        return NotebookRun(error=error)
+    runs = [execute_cells(att.nb, params, after_first=True) for _ in range(repeat)]
+    cells = [
+        min(cell.time for cell in cells)
+        for cells in zip(*(profile.cells for profile in runs), strict=True)
+    ]
+    result = NotebookRun(sum(cells[1:]), cells=cells)
+    start()
+    try:
+        execute_cells(att.nb, params, after_first=True)
+        _, result.peak = get_traced_memory()
+    finally:
+        stop()
+    return result
+
+
+def get_commit() -> str:
+    """Get the current commit, to file benchmark results under."""
+    try:
+        return run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S603, S607
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (CalledProcessError, FileNotFoundError):
+        return "unknown"
+
+
+def get_ancestors(commit: str) -> list[str]:
+    """Get the full hashes of a commit and its ancestors, nearest first."""
+    try:
+        return run(
+            ["git", "log", "--format=%H", commit],  # noqa: S603, S607
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.split()
+    except (CalledProcessError, FileNotFoundError):
+        return []
+
+
+def save_run(name: str, result: NotebookRun, commit: str | None = None):
+    """Save a benchmark result to the history of the current commit."""
+    path = HISTORY / f"{commit or get_commit()}.json"
+    results = loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    results[name] = asdict(result)
+    write_atomic(path, dumps(results, indent=2))
+
+
+def get_baseline(name: str, commit: str | None = None) -> NotebookRun | None:
+    """Get the successful result for a benchmark from the nearest earlier commit.
+
+    Only ancestors of the commit count, so results from commits on other branches, or
+    from commits since rewritten by a rebase, are never compared against.
+    """
+    saved = {path.stem: path for path in HISTORY.glob("*.json")}
+    if not saved:
+        return None
+    for ancestor in get_ancestors(commit or get_commit())[1:]:
+        path = next((p for stem, p in saved.items() if ancestor.startswith(stem)), None)
+        if not path:
+            continue
+        result = loads(path.read_text(encoding="utf-8")).get(name)
+        if result and not result["error"]:
+            return NotebookRun(**result)
+    return None
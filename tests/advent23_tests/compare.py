@@ -0,0 +1,133 @@
+"""Compare answers between users, executing each notebook once per day."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from functools import cache, cached_property
+from os import environ
+from re import Match
+from typing import Any
+
+from advent23 import EXAMPLES
+from advent23.matches import MatchSnapshot, check_match
+from advent23_tests.attempts import USERS, Attempt, get_cached_attempted_checks
+
+COMPARE = environ.get("ADVENT23_COMPARE", "")
+"""Set `ADVENT23_COMPARE` to test that users agree on answers to shared checkpoints.
+
+Set it to `all` to compare all users, or to a comma-separated list of users.
+"""
+
+
+@dataclass
+class AnswerMatrix:
+    """Answers of each user to each checkpoint they attempted on a day."""
+
+    day: str
+    """Zero-padded puzzle day."""
+    users: tuple[str, ...] = USERS
+    """Users to compare."""
+    errors: dict[str, Exception] = field(default_factory=dict)
+    """Exceptions raised by notebooks that failed to execute, by user."""
+
+    @cached_property
+    def attempts(self) -> dict[str, Attempt]:
+        """Attempts with notebooks, by user."""
+        return {
+            user: att
+            for user in self.users
+            if (att := Attempt(user, self.day)).nb and att.inp
+        }
+
+    @cached_property
+    def checks(self) -> list[str]:
+        """Checkpoints attempted by any user, in order of first appearance."""
+        return list(
+            dict.fromkeys(
+                check
+                for att in self.attempts.values()
+                for check in get_cached_attempted_checks(att.nb)
+            )
+        )
+
+    @cached_property
+    def answers(self) -> dict[str, dict[str, Any]]:
+        """Answers of each user to the checkpoints they attempted.
+
+        Each notebook is executed at most once, and users whose notebooks raise are
+        recorded in `errors` instead.
+        """
+        answers: dict[str, dict[str, Any]] = {}
+        for user, att in self.attempts.items():
+            try:
+                chk = att.get_chk()
+            except Exception as exc:  # noqa: BLE001
+                self.errors[user] = exc
+                continue
+            answers[user] = {
+                check: chk[check]
+                for check in get_cached_attempted_checks(att.nb)
+                if check in chk
+            }
+        return answers
+
+    def get_row(self, check: str) -> dict[str, Any]:
+        """Get answers to a checkpoint, by user."""
+        return {
+            user: answers[check]
+            for user, answers in self.answers.items()
+            if check in answers
+        }
+
+    def agrees(self, check: str) -> bool:
+        """Whether users who answered a checkpoint agree on the answer."""
+        first, *others = self.get_row(check).values() or [None]
+        return all(same_answer(first, other) for other in others)
+
+    def get_report(self) -> str:
+        """Get a report of agreements and disagreements on each checkpoint."""
+        lines = [f"Day {self.day}"]
+        for check in self.checks:
+            row = self.get_row(check)
+            users = ", ".join(row)
+            if len(row) < 2:
+                lines.append(f"  {check}: only {users or 'nobody'}")
+            elif self.agrees(check):
+                lines.append(f"  {check}: agree ({users})")
+            else:
+                lines.append(f"  {check}: disagree")
+                lines.extend(f"    {user}: {answer!r}" for user, answer in row.items())
+        lines.extend(
+            f"  {user} raised {type(exc).__name__}: {exc}"
+            for user, exc in self.errors.items()
+        )
+        return "\n".join(lines)
+
+
+@cache
+def get_answer_matrix(day: str, users: tuple[str, ...] = USERS) -> AnswerMatrix:
+    """Get the answer matrix for a day, built once per process."""
+    return AnswerMatrix(day, users)
+
+
+def walk_matrices(users: Iterable[str] = USERS) -> Iterator[AnswerMatrix]:
+    """Walk answer matrices for each day."""
+    for day in EXAMPLES:
+        yield get_answer_matrix(day, tuple(users))
+
+
+def get_compared_users(compare: str = COMPARE) -> tuple[str, ...]:
+    """Get users to compare from a comma-separated list, or `all`."""
+    if compare.casefold() == "all":
+        return USERS
+    return tuple(user for u in compare.casefold().split(",") if (user := u.strip()))
+
+
+def same_answer(answer: Any, other: Any) -> bool:
+    """Whether two answers are the same, comparing matches by their groups."""
+    if isinstance(answer, Match | MatchSnapshot) and isinstance(
+        other, Match | MatchSnapshot
+    ):
+        return check_match(answer, other)
+    return answer == other
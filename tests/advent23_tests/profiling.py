@@ -0,0 +1,249 @@
+"""Execute notebooks cell by cell, profiling each cell."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from cProfile import Profile
+from dataclasses import dataclass, field
+from pstats import SortKey, Stats
+from time import perf_counter
+from tracemalloc import get_traced_memory, is_tracing, reset_peak, start, stop
+from typing import Any
+
+from nbformat import NO_CONVERT, NotebookNode, reads
+
+from advent23_tests.attempts import CACHE, CHECKS, PROFILE
+
+PROFILES = CACHE / "profiles"
+"""Location of profiles, one set of files per user and day."""
+
+
+@dataclass
+class CellProfile:
+    """Profile of a notebook cell."""
+
+    index: int
+    """Index of the cell among code cells."""
+    time: float = 0.0
+    """Wall time of the cell, in seconds."""
+    allocated: int = 0
+    """Memory allocated by the cell and still held after it, in bytes."""
+    peak: int = 0
+    """Peak memory allocated while the cell executed, in bytes."""
+    checks: list[str] = field(default_factory=list)
+    """Checkpoints assigned in the cell."""
+
+
+@dataclass
+class NotebookProfile:
+    """Profile of a notebook, cell by cell."""
+
+    cells: list[CellProfile] = field(default_factory=list)
+    """Profiles of cells that were executed."""
+    ns: dict[str, Any] = field(default_factory=dict, repr=False)
+    """Notebook namespace after execution."""
+    exception: Exception | None = None
+    """Exception raised by a cell, which stops execution, if any."""
+    stats: Stats | None = field(default=None, repr=False)
+    """Function call statistics, if collected."""
+
+    @property
+    def time(self) -> float:
+        """Wall time of all executed cells, in seconds."""
+        return sum(cell.time for cell in self.cells)
+
+    @property
+    def error(self) -> str:
+        """Description of the exception raised by a cell, if any."""
+        if not (exc := self.exception):
+            return ""
+        return f"{type(exc).__name__} in cell {len(self.cells) - 1}: {exc}"
+
+    def get_check_times(self) -> dict[str, float]:
+        """Attribute time to checkpoints, slowest first.
+
+        Each checkpoint is attributed the time of the cell assigning it, along with
+        cells since the previous cell that assigned checkpoints, since those cells
+        likely worked towards it.
+        """
+        times: dict[str, float] = {}
+        pending = 0.0
+        for cell in self.cells:
+            pending += cell.time
+            if cell.checks:
+                times |= dict.fromkeys(cell.checks, pending)
+                pending = 0.0
+        return dict(sorted(times.items(), key=lambda t: t[1], reverse=True))
+
+    def get_report(self, name: str) -> str:
+        """Get a report of cells and checkpoints, slowest first."""
+        lines = [
+            f"{name}: {self.time * 1e3:.1f} ms"
+            + (f", {self.error}" if self.error else ""),
+            "",
+            f"{'cell':>4} {'time (ms)':>10} {'alloc (KiB)':>12} {'peak (KiB)':>11}"
+            "  checks",
+        ]
+        lines.extend(
+            f"{cell.index:>4} {cell.time * 1e3:>10.1f} {cell.allocated / 2**10:>12.1f}"
+            f" {cell.peak / 2**10:>11.1f}  {', '.join(cell.checks)}"
+            for cell in sorted(self.cells, key=lambda c: c.time, reverse=True)
+        )
+        lines.extend(["", f"{'time (ms)':>10}  check"])
+        lines.extend(
+            f"{time * 1e3:>10.1f}  {check}"
+            for check, time in self.get_check_times().items()
+        )
+        return "\n".join(lines) + "\n"
+
+    def get_folded(self, name: str) -> str:
+        """Get cell times as folded stacks in microseconds, for flame graphs."""
+        return "".join(
+            f"{name};cell {cell.index}"
+            + (f" [{', '.join(cell.checks)}]" if cell.checks else "")
+            + f" {round(cell.time * 1e6)}\n"
+            for cell in self.cells
+        )
+
+    def save(self, name: str):
+        """Save a report, folded stacks, and any call statistics to `PROFILES`."""
+        PROFILES.mkdir(parents=True, exist_ok=True)
+        (PROFILES / f"{name}.txt").write_text(
+            encoding="utf-8", data=self.get_report(name)
+        )
+        (PROFILES / f"{name}.folded").write_text(
+            encoding="utf-8", data=self.get_folded(name)
+        )
+        if self.stats:
+            self.stats.sort_stats(SortKey.CUMULATIVE)
+            self.stats.dump_stats(PROFILES / f"{name}.prof")
+
+
+def get_code_cells(nb: str) -> list[NotebookNode]:
+    """Get code cells of a notebook."""
+    return [
+        cell
+        for cell in reads(nb, NO_CONVERT).cells  # type: ignore  # pyright: 1.1.377
+        if cell.cell_type == "code"
+    ]
+
+
+def get_injection_index(cells: list[NotebookNode], after_first: bool = False) -> int:
+    """Get the index of the cell that parameters are injected before.
+
+    Parameters are injected after the cell tagged `parameters`. If none is tagged, they
+    are injected before the first cell, as `get_nb_ns` does, or after it.
+    """
+    return next(
+        (
+            i + 1
+            for i, cell in enumerate(cells)
+            if "parameters" in cell.metadata.get("tags", [])
+        ),
+        1 if after_first else 0,
+    )
+
+
+def execute_cell(
+    source: str,
+    cell: CellProfile,
+    ns: dict[str, Any],
+    profiler: Profile | None = None,
+    trace: bool = False,
+) -> Exception | None:
+    """Execute a notebook cell, recording its time and memory use in its profile.
+
+    Args:
+        source: Source code of the cell.
+        cell: Profile of the cell to record into.
+        ns: Notebook namespace to execute the cell in.
+        profiler: Profiler to collect function call statistics with, if any.
+        trace: Measure memory allocations, which must already be traced.
+
+    Returns:
+        The exception raised by the cell, if any.
+    """
+    before = 0
+    if trace:
+        reset_peak()
+        before, _ = get_traced_memory()
+    if profiler:
+        profiler.enable()
+    begin = perf_counter()
+    try:
+        exec(compile(source, f"<cell {cell.index}>", "exec"), ns)  # noqa: S102
+    except Exception as exc:  # noqa: BLE001
+        return exc
+    finally:
+        cell.time = perf_counter() - begin
+        if profiler:
+            profiler.disable()
+        if trace:
+            current, peak = get_traced_memory()
+            cell.allocated = current - before
+            cell.peak = peak - before
+    return None
+
+
+def execute_cells(
+    nb: str,
+    params: Mapping[str, Any],
+    after_first: bool = False,
+    trace: bool = False,
+    cprofile: bool = False,
+) -> NotebookProfile:
+    """Execute notebook cells in turn, profiling each of them.
+
+    Args:
+        nb: Jupyter notebook contents.
+        params: Names to set in the notebook namespace.
+        after_first: Inject parameters after the first cell if none is tagged.
+        trace: Trace memory allocations of each cell, which slows execution.
+        cprofile: Collect function call statistics.
+    """
+    from IPython.display import display
+
+    cells = get_code_cells(nb)
+    inject = get_injection_index(cells, after_first)
+    profile = NotebookProfile(ns={"__name__": "__main__", "display": display})
+    profiler = Profile() if cprofile else None
+    tracing = trace and not is_tracing()
+    if tracing:
+        start()
+    try:
+        for i, cell in enumerate(cells):
+            if i == inject:
+                profile.ns.update(params)
+            cell_profile = CellProfile(
+                i, checks=[match["check"] for match in CHECKS.finditer(cell.source)]
+            )
+            profile.cells.append(cell_profile)
+            if exc := execute_cell(
+                cell.source, cell_profile, profile.ns, profiler, trace
+            ):
+                profile.exception = exc
+                break
+        else:
+            if inject == len(cells):
+                profile.ns.update(params)
+    finally:
+        if tracing:
+            stop()
+    if profiler:
+        profile.stats = Stats(profiler)
+    return profile
+
+
+def profile_notebook(nb: str, inp: dict[str, str], name: str) -> NotebookProfile:
+    """Profile a notebook as executed for attempts, saving the results to `PROFILES`.
+
+    Args:
+        nb: Jupyter notebook contents.
+        inp: Inputs to pass to the notebook.
+        name: Name of the attempt, such as `blake_day05`.
+    """
+    profile = execute_cells(
+        nb, {"inp": inp}, trace=True, cprofile=PROFILE == "cprofile"
+    )
+    profile.save(name)
+    return profile
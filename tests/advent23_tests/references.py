@@ -0,0 +1,198 @@
+"""Reference implementations of puzzle solutions to test and benchmark against."""
+
+from collections.abc import Iterable
+from math import prod
+from operator import itemgetter
+from re import MULTILINE, compile, finditer
+
+import numpy as np
+
+from advent23.automata import DIGITS, NUMBERS
+from advent23.games import LIMITS, parse_games
+from advent23.grids import Grid
+from advent23.scratchcards import parse_cards
+
+
+def naive_games(text: str) -> tuple[int, int]:
+    """Split games into pulls and walk them for each part, as notebooks do."""
+    games = {
+        int(header.removeprefix("Game ")): [
+            {
+                color: int(count)
+                for count, color in (cubes.split() for cubes in pull.split(", "))
+            }
+            for pull in pulls.split("; ")
+        ]
+        for header, pulls in (line.split(": ") for line in text.splitlines())
+    }
+    possible = sum(
+        game
+        for game, pulls in games.items()
+        if all(
+            pull.get(color, 0) <= limit
+            for pull in pulls
+            for color, limit in LIMITS.items()
+        )
+    )
+    powers = sum(
+        prod(max(pull.get(color, 0) for pull in pulls) for color in LIMITS)
+        for pulls in games.values()
+    )
+    return possible, powers
+
+
+def columnar_games(text: str) -> tuple[int, int]:
+    """Answer both parts from a columnar table of pulls."""
+    games = parse_games.__wrapped__(text)
+    return int(games.ids[games.possible()].sum()), int(games.powers.sum())
+
+
+def scan_parts(text: str) -> tuple[int, int]:
+    """Solve day 3 by testing every number against every symbol, as notebooks do."""
+    lines = text.splitlines()
+    nums = [
+        (row, match.start(), match.end(), int(match.group()))
+        for row, line in enumerate(lines)
+        for match in finditer(r"\d+", line)
+    ]
+    symbols = [
+        (row, col, char)
+        for row, line in enumerate(lines)
+        for col, char in enumerate(line)
+        if char not in "0123456789."
+    ]
+    parts = sum(
+        num
+        for row, start, end, num in nums
+        if any(
+            row - 1 <= sym_row <= row + 1 and start - 1 <= sym_col <= end
+            for sym_row, sym_col, _ in symbols
+        )
+    )
+    gear_ratios = 0
+    for sym_row, sym_col, char in symbols:
+        if char != "*":
+            continue
+        neighbors = [
+            num
+            for row, start, end, num in nums
+            if row - 1 <= sym_row <= row + 1 and start - 1 <= sym_col <= end
+        ]
+        if len(neighbors) == 2:
+            gear_ratios += prod(neighbors)
+    return parts, gear_ratios
+
+
+def index_parts(text: str) -> tuple[int, int]:
+    """Solve day 3 with a grid index."""
+    grid = Grid(text)
+    symbols = "".join(set(text) - set("0123456789.\n"))
+    parts = int(grid.span_values[grid.touching(grid.mask(symbols))].sum())
+    gear_ratios = 0
+    for row, col in grid.points(grid.mask("*")).tolist():
+        if len(neighbors := grid.neighbors(row, col)) == 2:
+            gear_ratios += int(grid.span_values[neighbors].prod())
+    return parts, gear_ratios
+
+
+def naive_locations(text: str, seeds: Iterable[int]) -> list[int]:
+    """Map seeds one at a time, testing each rule in turn, as notebooks would."""
+    tables = [
+        [tuple(map(int, rule.split())) for rule in block.splitlines()[1:]]
+        for block in text.strip().split("\n\n")[1:]
+    ]
+    locations: list[int] = []
+    for seed in seeds:
+        for table in tables:
+            seed += next((d - s for d, s, n in table if s <= seed < s + n), 0)
+        locations.append(seed)
+    return locations
+
+
+def regex_calibration_values(text: str) -> list[int]:
+    """Find digits with a pattern and its reverse on each line, as notebooks do."""
+    values = {word: i % 10 for i, word in enumerate(DIGITS + NUMBERS)}
+    forward, backward = (
+        compile(flags=MULTILINE, pattern="|".join(words))
+        for words in (values, (word[::-1] for word in values))
+    )
+    calibration_values: list[int] = []
+    for line in text.splitlines():
+        first = forward.search(line)
+        last = backward.search(line[::-1])
+        calibration_values.append(
+            10 * values[first.group()] + values[last.group()[::-1]]
+            if first and last
+            else 0
+        )
+    return calibration_values
+
+
+def find_calibration_values(text: str) -> list[int]:
+    """Find digits by finding each word in turn on each line, as notebooks do."""
+    words = DIGITS + NUMBERS
+    calibration_values: list[int] = []
+    for line in text.splitlines():
+        found = [
+            (line.find(word), line.rfind(word), i % 10)
+            for i, word in enumerate(words)
+            if word in line
+        ]
+        calibration_values.append(
+            10 * min(found)[2] + max(found, key=itemgetter(1))[2] if found else 0
+        )
+    return calibration_values
+
+
+def synthesize_calibration(size: int, width: int = 40, digits: float = 0.1) -> str:
+    """Synthesize a calibration document of random lines of letters and digits.
+
+    Args:
+        size: Approximate size in bytes.
+        width: Characters in each line.
+        digits: Chance that each character is a digit.
+    """
+    rng = np.random.default_rng(0)
+    letters = np.frombuffer(b"abcdefghijklmnopqrstuvwxyz", dtype=np.uint8)
+    shape = (size // (width + 1), width + 1)
+    codes = np.where(
+        rng.random(shape) < digits,
+        rng.integers(ord("0"), ord("9") + 1, shape, dtype=np.uint8),
+        rng.choice(letters, shape),
+    ).astype(np.uint8)
+    codes[:, -1] = ord("\n")
+    return codes.tobytes().decode("ascii")
+
+
+def naive_cards(text: str) -> tuple[int, int]:
+    """Score cards with sets and count copies card by card, as notebooks do."""
+    all_wins: list[int] = []
+    for line in text.splitlines():
+        winning, drawn = (
+            [int(num) for num in nums.split()]
+            for nums in line.partition(":")[2].split("|")
+        )
+        all_wins.append(len(set(winning) & set(drawn)))
+    counts = [1] * len(all_wins)
+    for card, wins in enumerate(all_wins):
+        for won in range(card + 1, min(card + 1 + wins, len(counts))):
+            counts[won] += counts[card]
+    return sum(2 ** (wins - 1) for wins in all_wins if wins), sum(counts)
+
+
+def vectorized_cards(text: str) -> tuple[int, int]:
+    """Score cards and count copies with vectorized scratchcards."""
+    cards = parse_cards(text)
+    return int(cards.points.sum()), int(cards.copies().sum())
+
+
+def synthesize_cards(count: int, winning: int = 10, drawn: int = 25) -> str:
+    """Synthesize scratchcards of distinct two-digit numbers."""
+    rng = np.random.default_rng(0)
+    numbers = rng.random((count, 99)).argsort(axis=1)[:, : winning + drawn] + 1
+    width = len(str(count))
+    return "".join(
+        f"Card {card:>{width}}: {' '.join(f'{n:>2}' for n in row[:winning])} |"
+        f" {' '.join(f'{n:>2}' for n in row[winning:])}\n"
+        for card, row in enumerate(numbers.tolist(), 1)
+    )
@@ -0,0 +1,177 @@
+"""Execute attempts in parallel across a pool of worker processes."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from multiprocessing.connection import Connection, wait
+from multiprocessing.context import SpawnContext, SpawnProcess
+from os import cpu_count, environ
+from pickle import PicklingError
+from time import monotonic
+from typing import Any
+
+from advent23 import CheckDict
+from advent23_tests.attempts import CHECKPOINTS, Attempt, execute
+
+WORKERS = int(environ.get("ADVENT23_WORKERS", "0")) or cpu_count() or 1
+"""Number of worker processes. Set `ADVENT23_WORKERS` to override."""
+TIMEOUT = float(environ.get("ADVENT23_TIMEOUT", "300"))
+"""Seconds a notebook may execute before its worker is killed."""
+
+Key = tuple[str, str, str, str]
+"""Key for checkpoints resulting from executing an attempt."""
+
+
+def execute_attempts(
+    attempts: Iterable[Attempt], workers: int = WORKERS, timeout: float = TIMEOUT
+):
+    """Execute attempts in parallel, caching their checkpoints in `CHECKPOINTS`.
+
+    Each notebook is executed at most once, even if attempts are repeated. Results are
+    cached by attempt key as they arrive, so they do not depend on execution order. A
+    notebook that crashes its worker or exceeds the timeout has an exception cached in
+    place of its checkpoints, and its worker is replaced. Notebooks always execute in
+    workers, even if there is only one worker or attempt, so the timeout always
+    applies. Checkpoints that can't be pickled, even with matches replaced by
+    snapshots, are instead executed again afterwards in this process, having already
+    finished within the timeout in a worker.
+
+    Args:
+        attempts: Attempts to execute.
+        workers: Number of worker processes.
+        timeout: Seconds a notebook may execute before its worker is killed.
+    """
+    pending = {att.key: att for att in attempts if att.key not in CHECKPOINTS}
+    if not pending:
+        return
+    todo = deque(sorted(pending))
+    local: list[Key] = []
+    ctx = get_context("spawn")
+    idle = [Worker(ctx) for _ in range(max(1, min(workers, len(todo))))]
+    busy: dict[Connection, Worker] = {}
+    try:
+        while todo or busy:
+            while todo and idle:
+                worker = idle.pop()
+                worker.submit(key := todo.popleft(), pending[key])
+                busy[worker.conn] = worker
+            idle.extend(
+                busy.pop(conn).collect(local)  # type: ignore
+                for conn in wait(list(busy), timeout=min(1.0, timeout))
+            )
+            for conn, worker in list(busy.items()):
+                if monotonic() - worker.start > timeout:
+                    del busy[conn]
+                    CHECKPOINTS[worker.key] = TimeoutError(
+                        f"Executing {worker.key[:2]} took over {timeout} s."
+                    )
+                    idle.append(worker.replace())
+    finally:
+        for worker in idle + list(busy.values()):
+            worker.stop()
+    for key in local:
+        att = pending[key]
+        CHECKPOINTS[key] = execute(att.nb, att.inp, att.get_id(""))
+
+
+@dataclass
+class Worker:
+    """Worker process that executes notebooks sent to it over a pipe."""
+
+    ctx: SpawnContext
+    """Multiprocessing context."""
+    conn: Connection = field(init=False)
+    """Connection to the worker process."""
+    proc: SpawnProcess = field(init=False)
+    """Worker process."""
+    key: Key = field(init=False)
+    """Key of the attempt being executed."""
+    start: float = field(init=False)
+    """Time that the current attempt was submitted."""
+
+    def __post_init__(self):
+        self.conn, child = self.ctx.Pipe()
+        self.proc = self.ctx.Process(target=serve, args=(child,), daemon=True)
+        self.proc.start()
+        child.close()
+
+    def submit(self, key: Key, att: Attempt):
+        """Submit an attempt for execution."""
+        self.key = key
+        self.start = monotonic()
+        self.conn.send((att.nb, att.inp, att.get_id("")))
+
+    def receive(self) -> dict[str, Any] | Exception | None:
+        """Receive the result of executing the submitted attempt.
+
+        Returns checkpoints, the exception raised while executing, or `None` if the
+        checkpoints couldn't be pickled and must be executed in this process instead.
+        """
+        status, result = self.conn.recv()
+        if status == "ok":
+            return dict(CheckDict.loads(result))
+        if status == "error":
+            return result
+        return None
+
+    def collect(self, local: list[Key]) -> Worker:
+        """Cache the result of the submitted attempt in `CHECKPOINTS`.
+
+        Args:
+            local: Keys of attempts to execute in this process instead, appended to if
+                the checkpoints couldn't be pickled.
+
+        Returns:
+            This worker, or a new one in its place if this one crashed.
+        """
+        try:
+            result = self.receive()
+        except (EOFError, OSError):
+            CHECKPOINTS[self.key] = RuntimeError(
+                f"Worker crashed while executing {self.key[:2]}."
+            )
+            return self.replace()
+        if result is None:
+            local.append(self.key)
+        else:
+            CHECKPOINTS[self.key] = result
+        return self
+
+    def replace(self) -> Worker:
+        """Kill this worker and get a new one in its place."""
+        self.proc.kill()
+        self.stop()
+        return Worker(self.ctx)
+
+    def stop(self):
+        """Stop this worker."""
+        if self.proc.is_alive():
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                self.proc.kill()
+        self.proc.join(timeout=5)
+        if self.proc.is_alive():
+            self.proc.kill()
+        self.conn.close()
+
+
+def serve(conn: Connection):
+    """Execute notebooks received over a connection, sending back the results."""
+    while task := conn.recv():
+        result = execute(*task)
+        if isinstance(result, Exception):
+            try:
+                conn.send(("error", result))
+            except (PicklingError, TypeError, AttributeError):
+                conn.send(("error", RuntimeError(repr(result))))
+            continue
+        chk = CheckDict(display="headless")
+        chk.data = result
+        try:
+            conn.send(("ok", chk.dumps()))
+        except (PicklingError, TypeError, AttributeError):
+            conn.send(("local", None))
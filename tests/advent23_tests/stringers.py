@@ -0,0 +1,43 @@
+"""Stringers refined in notebooks, to test and benchmark against."""
+
+from re import MULTILINE
+
+from advent23.stringers import Stringer, group
+
+
+def get_notebook_stringers() -> dict[str, Stringer]:
+    """Get Stringers in the order that they are refined in notebooks."""
+    stringers: dict[str, Stringer] = {}
+    # blake/day02
+    s = stringers["day02_lines"] = Stringer(r"^$pat$$", pat=r".+").set_flags(MULTILINE)
+    s = stringers["day02_sets"] = s | dict(
+        pat=r"$game_count$sets", game_count=r"Game \d+: ", **group(r".+", "sets")
+    )
+    stringers["day02_games"] = s | dict(
+        game_count=r"Game $game_num: ", **group(r"\d+", "game_num")
+    )
+    stringers["day02_color"] = Stringer(
+        r"^$num $color.*$$", **group(r"\d+", "num"), **group(r"[r|g|b]", "color")
+    )
+    # blake/day04
+    s = stringers["day04_lines"] = Stringer(r"^$pat$$", pat=r".+").set_flags(MULTILINE)
+    stringers["day04_cards"] = (
+        s
+        | dict(pat=r"^Card\s+\d+: $winning \| $drawn$$")
+        | group(r".+", "winning")
+        | group(r".+", "drawn")
+    )
+    # blake/day05
+    s = stringers["day05_prompt"] = Stringer(r"^$pat+$$", pat=r"$any")
+    s = stringers["day05_seeds"] = s | dict(
+        pat=r"seeds: $seeds$sep$any+", **group(r"[\d\s]+", "seeds"), sep=r"\n\n"
+    )
+    stringers["day05_rules"] = s | dict(
+        pat=r"seeds: $seeds$sep$rules", **group(r"$any+", "rules")
+    )
+    stringers["day05_rule"] = Stringer(r"\w+-to-\w+ map:\n$any+?$sep", sep=r"\n\n")
+    return stringers
+
+
+NOTEBOOK_STRINGERS = get_notebook_stringers()
+"""Stringers refined in notebooks, by notebook and step."""
@@ -0,0 +1,77 @@
+"""Tests for Abdul's helpers."""
+
+import re
+from pathlib import Path
+
+import pytest
+
+from advent23 import EXAMPLES
+from advent23.abdul import (
+    color_outcome,
+    compare_color_set,
+    get_maxima,
+    get_possible,
+    get_powers,
+)
+from advent23.games import COLORS
+from advent23.inputs import load
+from advent23_tests.references import naive_games
+
+INPUTS = {
+    "empty": "",
+    "example": EXAMPLES["02"].inp["a"],
+    **{path.parent.name: load(path) for path in sorted(Path("input").glob("*/02.txt"))},
+}
+"""Empty, example, and full inputs of day 2."""
+
+
+def legacy_color_outcome(color: str, data_input: list[str]) -> list[set[int]]:
+    """Get the counts of a color in each game by searching pulls, as before tables."""
+    color_outcome_all_games: list[set[int]] = []
+    number_pattern = re.compile(pattern=r"(Game \d{1,5}):\s")
+    color_pattern = re.compile(pattern=rf"(\d{{1,5}} {color})")
+    for game in data_input:
+        m = re.search(number_pattern, game)
+        game_pulls = game[m.end() :]  # type: ignore
+        single_pull = re.split(r";\s+", game_pulls)
+        temp_set: set[int] = set()
+        for each_outcome in single_pull:
+            color_result = re.search(color_pattern, each_outcome)
+            if color_result is not None:
+                temp_set.add(int(color_result[0].strip(f"{color}")))
+            else:
+                temp_set.add(0)
+        color_outcome_all_games.append(temp_set)
+    return color_outcome_all_games
+
+
+def legacy_compare_color_set(color_set: set[int], color: str) -> set[int] | bool:
+    """Compare counts of a color against the bag, as before the limits table."""
+    for val in color_set:
+        if color == "red" and val > 12:
+            return False
+        if color == "green" and val > 13:
+            return False
+        if color == "blue" and val > 14:
+            return False
+    return color_set
+
+
+@pytest.mark.parametrize("color", COLORS)
+@pytest.mark.parametrize("name", INPUTS)
+def test_color_outcome(name: str, color: str):
+    """Outcomes should match those found by searching each pull."""
+    data_input = INPUTS[name].splitlines()
+    outcomes = color_outcome(color, data_input)
+    assert outcomes == legacy_color_outcome(color, data_input)
+    assert [compare_color_set(outcome, color) for outcome in outcomes] == [
+        legacy_compare_color_set(outcome, color) for outcome in outcomes
+    ]
+
+
+@pytest.mark.parametrize("name", INPUTS)
+def test_maxima(name: str):
+    """Possible games and powers should answer day 2 like walking games does."""
+    maxima = get_maxima(INPUTS[name].splitlines())
+    possible = int(maxima.index[get_possible(maxima)].to_series().sum())
+    assert (possible, int(get_powers(maxima).sum())) == naive_games(INPUTS[name])
@@ -3,6 +3,32 @@
 import pytest
 
 from advent23_tests.attempts import Attempt, walk_attempts
+from advent23_tests.compare import (
+    COMPARE,
+    AnswerMatrix,
+    get_compared_users,
+    walk_matrices,
+)
+from advent23_tests.runner import execute_attempts
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _execute_selected(request: pytest.FixtureRequest):
+    """Execute notebooks of attempts selected in this module in parallel beforehand."""
+    params = [
+        getattr(getattr(item, "callspec", None), "params", {})
+        for item in request.session.items
+        if getattr(item, "module", None) is request.module
+    ]
+    execute_attempts([
+        *(p["att"] for p in params if "att" in p),
+        *(
+            att
+            for p in params
+            if isinstance(matrix := p.get("matrix"), AnswerMatrix)
+            for att in matrix.attempts.values()
+        ),
+    ])
 
 
 @pytest.mark.parametrize(
@@ -16,3 +42,17 @@ from advent23_tests.attempts import Attempt, walk_attempts
 def test_example(att: Attempt, check: str):
     """Test attempts against examples and their answers in `input/examples.toml`."""
     assert att.get_answer(check) == att.get_expected_answer(check)
+
+
+@pytest.mark.skipif(not COMPARE, reason="Set ADVENT23_COMPARE to compare users.")
+@pytest.mark.parametrize(
+    ("matrix", "check"),
+    (
+        pytest.param(matrix, check, id=f"day{matrix.day}_{check}")
+        for matrix in (walk_matrices(get_compared_users()) if COMPARE else ())
+        for check in matrix.checks
+    ),
+)
+def test_compare(matrix: AnswerMatrix, check: str):
+    """Test that users who attempted a checkpoint agree on its answer."""
+    assert matrix.agrees(check), matrix.get_row(check)
@@ -0,0 +1,108 @@
+"""Tests for finding words with automata."""
+
+from operator import itemgetter
+from random import Random
+
+import pytest
+
+from advent23 import EXAMPLES
+from advent23.automata import Automaton, get_calibration_values
+from advent23_tests.references import (
+    find_calibration_values,
+    regex_calibration_values,
+    synthesize_calibration,
+)
+
+EXAMPLE = EXAMPLES["01"]
+"""Example of day 1."""
+WORDS = ("a", "ab", "bab", "aa", "b\tb", "abba")
+"""Words that overlap each other in many ways."""
+
+
+def naive_find(words: tuple[str, ...], text: str) -> list[tuple[int, int, int]]:
+    """Find the start, word, and line of overlapping matches by testing each position.
+
+    Matches are ordered by where they end, then longest first.
+    """
+    return sorted(
+        (
+            (start, index, text.count("\n", 0, start))
+            for start in range(len(text))
+            for index, word in enumerate(words)
+            if text.startswith(word, start)
+        ),
+        key=lambda match: (match[0] + len(words[match[1]]), -len(words[match[1]])),
+    )
+
+
+def naive_first_last(words: tuple[str, ...], text: str) -> list[tuple[int, int]]:
+    """Find the first and last word in each line by testing each position."""
+    first_last: list[tuple[int, int]] = []
+    for line in text.splitlines():
+        found = [
+            (start, len(word), index)
+            for start in range(len(line))
+            for index, word in enumerate(words)
+            if line.startswith(word, start)
+        ]
+        first_last.append(
+            (
+                min(found, key=lambda m: (m[0], -m[1]))[2],
+                max(found, key=itemgetter(0, 1))[2],
+            )
+            if found
+            else (-1, -1)
+        )
+    return first_last
+
+
+def random_text(seed: int) -> str:
+    """Get random lines of characters from `WORDS`, some empty, maybe unterminated."""
+    rng = Random(seed)
+    return "".join(rng.choice("aab\t\n") for _ in range(rng.randrange(60)))
+
+
+@pytest.mark.parametrize("words", [(), ("a", ""), ("a\nb",)])
+def test_automaton_invalid_words_raise(words: tuple[str, ...]):
+    with pytest.raises(ValueError, match="Words must be"):
+        Automaton(words)
+
+
+def test_find_overlapping():
+    words = ("he", "she", "his", "hers")
+    starts, found, lines = Automaton(words).find("ushers\nhis")
+    assert [words[i] for i in found] == ["she", "he", "hers", "his"]
+    assert starts.tolist() == [1, 2, 2, 7]
+    assert lines.tolist() == [0, 0, 0, 1]
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_find(seed: int):
+    """Automata should find every overlapping match, ordered by where it ends."""
+    text = random_text(seed)
+    starts, words, lines = Automaton(WORDS).find(text)
+    matches = zip(starts.tolist(), words.tolist(), lines.tolist(), strict=True)
+    assert list(matches) == naive_find(WORDS, text)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_first_last(seed: int):
+    """Automata should find the first and last word of each line."""
+    text = random_text(seed)
+    first, last = Automaton(WORDS).first_last(text)
+    first_last = zip(first.tolist(), last.tolist(), strict=True)
+    assert list(first_last) == naive_first_last(WORDS, text)
+
+
+def test_calibration_example():
+    inp, chk = EXAMPLE.inp, EXAMPLE.chk
+    values = get_calibration_values(inp["a"], numbers=False)
+    assert values.tolist() == chk["calibration_values"]
+    assert get_calibration_values(inp["b"]).tolist() == chk["calibration_values_2"]
+
+
+def test_calibration_values():
+    """Automata should find digits like per-line searches do."""
+    text = synthesize_calibration(10**4)
+    assert get_calibration_values(text).tolist() == regex_calibration_values(text)
+    assert find_calibration_values(text) == regex_calibration_values(text)
@@ -0,0 +1,379 @@
+"""Benchmarks for shared machinery used in attempts."""
+
+from collections import deque
+from collections.abc import Callable
+from copy import deepcopy
+from functools import partial
+from operator import or_
+from pathlib import Path
+from re import Pattern
+from subprocess import run
+from sys import executable
+from typing import Any
+
+import pytest
+
+from advent23.automata import get_calibration_values
+from advent23.games import load_games
+from advent23.inputs import load
+from advent23.intervals import Range, parse_almanac
+from advent23.stringers import Stringer, group
+from advent23_tests import benchmarks
+from advent23_tests.attempts import Attempt
+from advent23_tests.benchmarks import (
+    BENCHMARKS,
+    FLOOR,
+    THRESHOLD,
+    NotebookRun,
+    benchmark_attempt,
+    get_baseline,
+    measure,
+    save_run,
+    walk_benchmarks,
+)
+from advent23_tests.references import (
+    columnar_games,
+    find_calibration_values,
+    index_parts,
+    naive_cards,
+    naive_games,
+    naive_locations,
+    regex_calibration_values,
+    scan_parts,
+    synthesize_calibration,
+    synthesize_cards,
+    vectorized_cards,
+)
+from advent23_tests.stringers import NOTEBOOK_STRINGERS
+
+STEPS = 20
+"""Number of steps in a refinement chain."""
+IMPORT_TIME_LIMIT = 0.25
+"""Seconds that importing modules used in notebooks may take."""
+INPUT = Path("input")
+"""Puzzle inputs."""
+GRID_SCALE = 10
+"""Number of times to repeat the rows of an input to synthesize a larger grid."""
+SEEDS_PER_RANGE = 1000
+"""Seeds to take from each seed range when mapping seeds one at a time."""
+SYNTHETIC_SIZE = 10**8
+"""Size in bytes of a synthetic calibration document."""
+STREAM_REPEATS = 200
+"""Number of times to repeat an input when streaming it."""
+CARD_COUNT = 10**6
+"""Number of synthetic scratchcards."""
+
+
+def refine(steps: int, op=or_) -> list[Stringer]:
+    """Refine a Stringer in steps, keeping each step as notebook cells would."""
+    chain = [Stringer(r"^$pat+$$", pat=r"$any")]
+    for i in range(steps):
+        chain.append(
+            op(
+                chain[-1],
+                dict(pat=rf"$g{i}\n$pat_{i}", **{f"pat_{i}": "$any"})
+                | group(r"\d+", f"g{i}"),
+            )
+        )
+        chain[-1].compile()
+    return chain
+
+
+def deepcopy_or(stringer: Stringer, other: dict[str, Any]) -> Stringer:
+    """Update a deep copy of a Stringer, as `|` did before structural sharing."""
+    return deepcopy(stringer).__ior__(other)
+
+
+@pytest.mark.slow()
+def test_stringer_refinement_chain(record_property: Callable[[str, object], None]):
+    """Structural sharing should use less memory than deep copies when refining."""
+    shared_chain, copied_chain = refine(STEPS), refine(STEPS, deepcopy_or)
+    assert [s.sub() for s in shared_chain] == [s.sub() for s in copied_chain]
+    shared = measure(lambda: refine(STEPS))
+    copied = measure(lambda: refine(STEPS, deepcopy_or))
+    record_property("shared", str(shared))
+    record_property("copied", str(copied))
+    assert shared.peak < copied.peak, f"{shared} shared, {copied} copied"
+
+
+@pytest.mark.slow()
+@pytest.mark.skipif(BENCHMARKS != "full", reason="Set ADVENT23_BENCHMARKS=full to run.")
+def test_stringer_refinement_chain_speed():
+    """Structural sharing should refine faster than deep copies."""
+    shared = measure(lambda: refine(STEPS), trace=False)
+    copied = measure(lambda: refine(STEPS, deepcopy_or), trace=False)
+    assert shared.time < copied.time, f"{shared} shared, {copied} copied"
+
+
+def get_import_times(module: str) -> dict[str, float]:
+    """Get the cumulative time in seconds to import a module and each it imports."""
+    args = [executable, "-X", "importtime", "-c", f"import {module}"]
+    result = run(args, capture_output=True, check=True, text=True)  # noqa: S603
+    return {
+        name.strip(): int(cumulative) / 1e6
+        for _, cumulative, name in (
+            line.split("|") for line in result.stderr.splitlines() if "|" in line
+        )
+        if cumulative.strip().isdigit()
+    }
+
+
+@pytest.mark.slow()
+@pytest.mark.parametrize("module", ["advent23", "advent23.stringers"])
+def test_import_skips_ipython(module: str):
+    """Importing shouldn't import IPython."""
+    assert "IPython" not in get_import_times(module)
+
+
+@pytest.mark.slow()
+@pytest.mark.skipif(BENCHMARKS != "full", reason="Set ADVENT23_BENCHMARKS=full to run.")
+@pytest.mark.parametrize("module", ["advent23", "advent23.stringers"])
+def test_import_time(module: str):
+    """Importing shouldn't take long."""
+    assert get_import_times(module)[module] < IMPORT_TIME_LIMIT
+
+
+@pytest.mark.slow()
+@pytest.mark.parametrize("name", NOTEBOOK_STRINGERS)
+def test_optimized_pattern_matches(name: str):
+    """Optimized patterns should find the same matches as the patterns they rewrite."""
+    stringer = NOTEBOOK_STRINGERS[name]
+    inp = load(INPUT / "blake" / f"{name.removeprefix('day')[:2]}.txt")
+    matches = {
+        optimize: [
+            (m.span(), m.groups())
+            for m in stringer.compile(optimize=optimize).finditer(inp)
+        ]
+        for optimize in (False, True)
+    }
+    assert matches[True] == matches[False]
+
+
+@pytest.mark.slow()
+@pytest.mark.skipif(BENCHMARKS != "full", reason="Set ADVENT23_BENCHMARKS=full to run.")
+@pytest.mark.parametrize("name", NOTEBOOK_STRINGERS)
+def test_optimized_pattern_throughput(
+    name: str, record_property: Callable[[str, object], None]
+):
+    """Optimized patterns should match full inputs at least as fast as raw patterns."""
+    stringer = NOTEBOOK_STRINGERS[name]
+    inputs = [
+        load(path)
+        for path in sorted(INPUT.glob(f"*/{name.removeprefix('day')[:2]}.txt"))
+    ]
+    size = sum(len(inp.encode("utf-8")) for inp in inputs)
+
+    def find_all(pattern: Pattern[str]):
+        for inp in inputs:
+            deque(pattern.finditer(inp), maxlen=0)
+
+    raw, optimized = (
+        measure(partial(find_all, stringer.compile(optimize=optimize)))
+        for optimize in (False, True)
+    )
+    report = (
+        f"{raw.get_throughput(size):.1f} MB/s raw,"
+        f" {optimized.get_throughput(size):.1f} MB/s optimized"
+    )
+    record_property("throughput", report)
+    assert optimized.time <= raw.time * (1 + THRESHOLD), report
+
+
+@pytest.mark.slow()
+@pytest.mark.parametrize(
+    "path", sorted(INPUT.glob("*/03.txt")), ids=lambda path: path.parent.name
+)
+def test_grid_parts(path: Path):
+    """A grid index should solve day 3 like nested scans."""
+    text = load(path)
+    assert index_parts(text) == scan_parts(text)
+
+
+@pytest.mark.slow()
+@pytest.mark.skipif(BENCHMARKS != "full", reason="Set ADVENT23_BENCHMARKS=full to run.")
+@pytest.mark.parametrize("scale", [1, GRID_SCALE])
+@pytest.mark.parametrize(
+    "path", sorted(INPUT.glob("*/03.txt")), ids=lambda path: path.parent.name
+)
+def test_grid_parts_speed(
+    path: Path, scale: int, record_property: Callable[[str, object], None]
+):
+    """A grid index should solve day 3 faster than nested scans, and scale better."""
+    text = load(path).rstrip("\n") + "\n"
+    text *= scale
+    assert index_parts(text) == scan_parts(text)
+    index = measure(lambda: index_parts(text), repeat=1, trace=False)
+    scan = measure(lambda: scan_parts(text), repeat=1, trace=False)
+    record_property("index", str(index))
+    record_property("scan", str(scan))
+    assert index.time < scan.time, f"{index} indexed, {scan} scanned"
+
+
+def get_seed_sample(text: str) -> list[Range]:
+    """Get seed ranges of an almanac, cut to `SEEDS_PER_RANGE` seeds each."""
+    return [
+        (start, min(stop, start + SEEDS_PER_RANGE))
+        for start, stop in parse_almanac(text).seed_ranges
+    ]
+
+
+@pytest.mark.slow()
+@pytest.mark.parametrize(
+    "path", sorted(INPUT.glob("*/05.txt")), ids=lambda path: path.parent.name
+)
+def test_almanac(path: Path):
+    """Mapping ranges should agree with mapping seeds one at a time."""
+    text = load(path)
+    almanac = parse_almanac(text)
+    ranges = get_seed_sample(text)
+    seeds = [seed for start, stop in ranges for seed in range(start, stop)]
+    assert almanac.locations() == naive_locations(text, almanac.seeds)
+    assert almanac.lowest_location(ranges) == min(naive_locations(text, seeds))
+
+
+@pytest.mark.slow()
+@pytest.mark.skipif(BENCHMARKS != "full", reason="Set ADVENT23_BENCHMARKS=full to run.")
+@pytest.mark.parametrize(
+    "path", sorted(INPUT.glob("*/05.txt")), ids=lambda path: path.parent.name
+)
+def test_almanac_speed(path: Path, record_property: Callable[[str, object], None]):
+    """Mapping all seed ranges should beat mapping a sample of seeds one at a time."""
+    text = load(path)
+    seed_ranges = parse_almanac(text).seed_ranges
+    seeds = [
+        seed for start, stop in get_seed_sample(text) for seed in range(start, stop)
+    ]
+    intervals = measure(lambda: parse_almanac(text).lowest_location(seed_ranges))
+    naive = measure(lambda: naive_locations(text, seeds))
+    record_property("intervals", str(intervals))
+    record_property("naive", str(naive))
+    assert intervals.time < naive.time, f"{intervals} with ranges, {naive} naive"
+
+
+@pytest.mark.slow()
+@pytest.mark.skipif(BENCHMARKS != "full", reason="Set ADVENT23_BENCHMARKS=full to run.")
+@pytest.mark.parametrize(
+    "att", (pytest.param(att, id=att.get_id("")) for att in walk_benchmarks())
+)
+def test_notebook(att: Attempt):
+    """Notebooks shouldn't get much slower on full inputs than in earlier commits."""
+    name = f"{att.user}/{att.day}"
+    baseline = get_baseline(name)
+    result = benchmark_attempt(att)
+    save_run(name, result)
+    if baseline and not result.error:
+        slowest = max(range(1, len(result.cells)), key=result.cells.__getitem__)
+        limit = max(baseline.time * (1 + THRESHOLD), baseline.time + FLOOR)
+        assert result.time <= limit, f"Slowest cell {slowest}"
+
+
+def test_baseline_follows_ancestry(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Baselines should come from the nearest ancestor with a successful result."""
+    monkeypatch.setattr(benchmarks, "HISTORY", tmp_path)
+    monkeypatch.setattr(
+        benchmarks, "get_ancestors", lambda _: ["head", "failed", "parent", "root"]
+    )
+    for commit, time, error in [
+        ("root", 1.0, ""),
+        ("parent", 2.0, ""),
+        ("failed", 3.0, "Error"),
+        ("rebased", 4.0, ""),
+        ("head", 5.0, ""),
+    ]:
+        save_run("user/01", NotebookRun(time, error=error), commit=commit[:3])
+    assert get_baseline("user/01", "head") == NotebookRun(2.0)
+    assert get_baseline("user/02", "head") is None
+
+
+@pytest.mark.slow()
+@pytest.mark.parametrize(
+    "path", sorted(INPUT.glob("*/01.txt")), ids=lambda path: path.parent.name
+)
+def test_calibration(path: Path):
+    """An automaton should find digits like per-line searches."""
+    text = load(path)
+    expected = regex_calibration_values(text)
+    assert find_calibration_values(text) == expected
+    assert get_calibration_values(text).tolist() == expected
+
+
+@pytest.mark.slow()
+@pytest.mark.skipif(BENCHMARKS != "full", reason="Set ADVENT23_BENCHMARKS=full to run.")
+@pytest.mark.parametrize(
+    "path", sorted(INPUT.glob("*/01.txt")), ids=lambda path: path.parent.name
+)
+def test_calibration_speed(path: Path, record_property: Callable[[str, object], None]):
+    """An automaton should keep up with per-line searches on full inputs."""
+    text = load(path)
+    times: dict[str, float] = {}
+    for name, f in [
+        ("automaton", get_calibration_values),
+        ("regex", regex_calibration_values),
+        ("find", find_calibration_values),
+    ]:
+        measurement = measure(partial(f, text))
+        record_property(name, str(measurement))
+        times[name] = measurement.time
+    assert times["automaton"] <= min(times["regex"], times["find"]) * (1 + THRESHOLD)
+
+
+@pytest.mark.slow()
+@pytest.mark.skipif(BENCHMARKS != "full", reason="Set ADVENT23_BENCHMARKS=full to run.")
+def test_calibration_synthetic():
+    """An automaton should keep up with per-line searches on large documents."""
+    text = synthesize_calibration(SYNTHETIC_SIZE)
+    assert get_calibration_values(text).tolist() == regex_calibration_values(text)
+    automaton = measure(lambda: get_calibration_values(text), repeat=1)
+    regex = measure(lambda: regex_calibration_values(text), repeat=1)
+    assert automaton.time <= regex.time * (1 + THRESHOLD)
+
+
+@pytest.mark.slow()
+def test_finditer_stream_memory(tmp_path: Path):
+    """Streaming matches should hold less in memory than matching the whole input."""
+    stringer = NOTEBOOK_STRINGERS["day02_games"]
+    path = tmp_path / "02.txt"
+    text = load(INPUT / "blake" / "02.txt") * STREAM_REPEATS
+    path.write_text(encoding="utf-8", data=text)
+
+    def count_whole() -> int:
+        text = path.read_text(encoding="utf-8")
+        return sum(1 for _ in stringer.compile().finditer(text))
+
+    def count_stream() -> int:
+        return sum(1 for _ in stringer.finditer_stream(path, max_len=2**10))
+
+    assert count_stream() == count_whole()
+    assert measure(count_stream).peak < measure(count_whole).peak
+
+
+@pytest.mark.slow()
+@pytest.mark.parametrize(
+    "path", sorted(INPUT.glob("*/04.txt")), ids=lambda path: path.parent.name
+)
+def test_cards(path: Path):
+    """Vectorized scratchcards should score and copy cards like notebooks do."""
+    text = load(path)
+    assert vectorized_cards(text) == naive_cards(text)
+
+
+@pytest.mark.slow()
+@pytest.mark.skipif(BENCHMARKS != "full", reason="Set ADVENT23_BENCHMARKS=full to run.")
+def test_cards_synthetic():
+    """Vectorized scratchcards should keep up with notebooks on many cards."""
+    text = synthesize_cards(CARD_COUNT)
+    assert vectorized_cards(text) == naive_cards(text)
+    vectorized = measure(lambda: vectorized_cards(text), repeat=1)
+    naive = measure(lambda: naive_cards(text), repeat=1)
+    assert vectorized.time <= naive.time * (1 + THRESHOLD)
+
+
+@pytest.mark.slow()
+@pytest.mark.parametrize(
+    "path", sorted(INPUT.glob("*/02.txt")), ids=lambda path: path.parent.name
+)
+def test_games(path: Path):
+    """A columnar table of pulls should answer day 2 like walking games does."""
+    text = load(path)
+    assert columnar_games(text) == naive_games(text)
+    assert load_games(path) is load_games(path)
@@ -0,0 +1,116 @@
+"""Tests for displaying checkpoints."""
+
+from re import MULTILINE, compile, search
+from typing import Any
+
+import pytest
+
+import advent23
+from advent23 import (
+    DISPLAY,
+    LINE_LIMIT,
+    WIDTH_LIMIT,
+    WIDTH_MSG,
+    WIDTH_MSG_FIRST,
+    CheckDict,
+    DisplayMode,
+    get_display_mode,
+    preview,
+)
+
+
+@pytest.fixture()
+def shown(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, Any]]:
+    """Record objects displayed with their names instead of displaying them."""
+    shown: list[tuple[str, Any]] = []
+    monkeypatch.setattr(advent23, "disp_name", lambda *args: shown.append(args))
+    return shown
+
+
+@pytest.mark.parametrize(
+    ("mode", "on_set", "on_render"),
+    [
+        ("eager", [("Part 1", 8), ("Games", [1])], []),
+        ("deferred", [], [("Part 1", 8), ("Games", [1])]),
+        ("headless", [], []),
+    ],
+)
+def test_display_modes(
+    shown: list[tuple[str, Any]],
+    mode: DisplayMode,
+    on_set: list[tuple[str, Any]],
+    on_render: list[tuple[str, Any]],
+):
+    """Items should be displayed when set, when rendered, or never."""
+    chk = CheckDict(display=mode)
+    chk["a"] = 8
+    chk.disp("games", [1])
+    assert shown == on_set
+    shown.clear()
+    chk.render()
+    chk.render()
+    assert shown == on_render
+
+
+@pytest.mark.parametrize(
+    ("env", "expected"),
+    [("", "eager"), ("deferred", "deferred"), ("headless", "headless"), ("x", "eager")],
+)
+def test_display_mode_env(monkeypatch: pytest.MonkeyPatch, env: str, expected: str):
+    """Display mode should default to the environment, or `eager` if it isn't valid."""
+    monkeypatch.setenv(DISPLAY, env)
+    assert get_display_mode() == CheckDict().mode == expected
+
+
+def test_display_mode_invalid_raises():
+    with pytest.raises(ValueError, match="Display mode"):
+        get_display_mode("x")  # type: ignore
+
+
+def legacy_truncate(string: str) -> str:
+    """Truncate long strings after rendering them in full, as before lazy previews."""
+    string = (
+        f"{match.group()}... <view truncated> ..."
+        if (match := compile(rf"^(?:.*\n){{{LINE_LIMIT}}}").match(string))
+        else string
+    )
+    if compile(rf"^.{{{WIDTH_LIMIT},}}", flags=MULTILINE).search(string):
+        lines = compile(rf"^.{{,{WIDTH_LIMIT}}}", flags=MULTILINE).findall(string)
+        lines[0] = f"{lines[0]}{WIDTH_MSG_FIRST}"
+        string = lines[0] + "\n" + f"{WIDTH_MSG}\n".join(lines[1:])
+    return string
+
+
+def legacy_preview(elem: Any) -> str:
+    """Preview an object by rendering it in full, as before lazy previews."""
+    if isinstance(elem, str):
+        return legacy_truncate(elem)
+    return legacy_truncate(str(elem).replace(",", ",\n"))
+
+
+RECURSIVE: list[Any] = [1, 2]
+RECURSIVE.append(RECURSIVE)
+
+
+@pytest.mark.parametrize(
+    "elem",
+    [
+        pytest.param("short", id="str"),
+        pytest.param("line\n" * 40, id="str-long"),
+        pytest.param("x" * 200 + "\ny", id="str-wide"),
+        pytest.param(list(range(40)), id="list-long"),
+        pytest.param([["a" * 100, "b'c"], ('d"e',), {1: {2, 3}}], id="nested-wide"),
+        pytest.param(
+            {f"key{i}": [(i,), frozenset(), set(), "x" * i] for i in range(30)},
+            id="nested-long",
+        ),
+        pytest.param(["'" * 2000, '"' * 2000, "'\"" * 2000], id="quotes"),
+        pytest.param(RECURSIVE, id="recursive"),
+        pytest.param(search(r"x+", "a" + "x" * 5000), id="match-long"),
+        pytest.param([search(r"'(\w+)", "a'b, c")], id="match-nested"),
+        pytest.param(range(20), id="other"),
+    ],
+)
+def test_preview(elem: Any):
+    """Lazy previews should match previews of objects rendered in full."""
+    assert preview(elem) == legacy_preview(elem)
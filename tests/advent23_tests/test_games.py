@@ -0,0 +1,69 @@
+"""Tests for games of cubes."""
+
+from pathlib import Path
+
+import pytest
+
+from advent23 import EXAMPLES
+from advent23.games import CACHED, COLORS, LIMITS, load_games, parse_games
+from advent23_tests.references import columnar_games, naive_games
+
+EXAMPLE = EXAMPLES["02"]
+"""Example of day 2."""
+
+
+def test_games_example():
+    games = parse_games(EXAMPLE.inp["a"])
+    chk = EXAMPLE.chk
+    assert games.game[:3].tolist() == [1, 1, 1]
+    assert games.pull[:3].tolist() == [0, 1, 2]
+    assert games.counts[:3].tolist() == [[4, 0, 3], [1, 2, 6], [0, 2, 0]]
+    assert [LIMITS[color] for color in COLORS] == chk["bag"]
+    assert games.ids[games.possible()].tolist() == chk["possible"]
+    assert games.maxima.tolist() == [
+        chk[f"game_{number}_fewest"]
+        for number in ("one", "two", "three", "four", "five")
+    ]
+    assert games.powers.tolist() == chk["minimum_power"]
+    assert columnar_games(EXAMPLE.inp["a"]) == naive_games(EXAMPLE.inp["a"])
+
+
+def test_games_out_of_order():
+    """Games should keep their own numbers and the order they appear in."""
+    games = parse_games("Game 7: 1 red\nGame 3: 2 blue; 1 green, 5 blue\n")
+    assert games.ids.tolist() == [7, 3]
+    assert games.maxima.tolist() == [[1, 0, 0], [0, 1, 5]]
+    assert games.possible({"red": 0, "green": 1, "blue": 5}).tolist() == [False, True]
+
+
+def test_games_empty():
+    games = parse_games("")
+    assert games.maxima.shape == (0, len(COLORS))
+    assert games.powers.tolist() == []
+
+
+def test_load_games(tmp_path: Path):
+    """Games should only be parsed again once their input changes."""
+    path = tmp_path / "02.txt"
+    path.write_text("Game 1: 1 red\n", encoding="utf-8")
+    games = load_games(path)
+    assert load_games(path) is games
+    path.write_text("Game 1: 1 red\nGame 2: 1 blue\n", encoding="utf-8")
+    assert load_games(path).ids.tolist() == [1, 2]
+
+
+def test_parse_games_cache_bounded():
+    """Only tables of the most recently parsed texts should be kept."""
+    for number in range(2 * CACHED):
+        parse_games(f"Game {number}: 1 red\n")
+    assert parse_games.cache_info().currsize <= CACHED
+
+
+@pytest.mark.parametrize("limit", [0, 1, 5])
+def test_games_possible(limit: int):
+    """Games should be possible exactly when no pull exceeds the bag."""
+    games = parse_games(EXAMPLE.inp["a"])
+    limits: dict[str, int] = dict.fromkeys(COLORS, limit)
+    assert games.possible(limits).tolist() == [
+        (games.counts[games.game == game] <= limit).all() for game in games.ids.tolist()
+    ]
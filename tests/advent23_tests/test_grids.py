@@ -0,0 +1,62 @@
+"""Tests for character grids."""
+
+import numpy as np
+import pytest
+
+from advent23 import EXAMPLES
+from advent23.grids import Grid, dilate
+from advent23_tests.references import index_parts, scan_parts
+
+EXAMPLE = EXAMPLES["03"]
+"""Example of day 3."""
+
+
+def synthesize_grid(rows: int, cols: int, seed: int) -> str:
+    """Synthesize a grid of digits, dots, and symbols, mostly dots."""
+    rng = np.random.default_rng(seed)
+    cells = rng.choice(list("..........0123456789*#$"), (rows, cols))
+    return "".join("".join(row) + "\n" for row in cells)
+
+
+def test_grid_spans():
+    grid = Grid("12.\n..3")
+    assert grid.chars.shape == (2, 3)
+    assert grid.span_text == ["12", "3"]
+    assert grid.span_rows.tolist() == [0, 1]
+    assert grid.span_starts.tolist() == [0, 2]
+    assert grid.span_ends.tolist() == [2, 3]
+    assert grid.span_ids.tolist() == [[0, 0, -1], [-1, -1, 1]]
+    assert grid.span_values.tolist() == [12, 3]
+
+
+def test_grid_ragged_raises():
+    with pytest.raises(ValueError, match="equal widths"):
+        Grid("12.\n..\n")
+
+
+def test_dilate():
+    mask = np.zeros((4, 4), dtype=np.bool_)
+    mask[0, 0] = mask[3, 3] = True
+    assert dilate(mask).astype(int).tolist() == [
+        [1, 1, 0, 0],
+        [1, 1, 0, 0],
+        [0, 0, 1, 1],
+        [0, 0, 1, 1],
+    ]
+
+
+def test_grid_example():
+    grid = Grid(EXAMPLE.inp["a"])
+    symbols = grid.mask("*#+$")
+    chk = EXAMPLE.chk
+    assert grid.points(symbols).tolist() == chk["symbol_positions"]
+    assert grid.span_values[~grid.touching(symbols)].tolist() == chk["not_parts"]
+    assert grid.span_values[grid.neighbors(1, 3)].tolist() == chk["first_gear"]
+    assert index_parts(EXAMPLE.inp["a"]) == (chk["a"], chk["sum_of_all_gear_ratios"])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_grid_matches_scan(seed: int):
+    """A grid index should find the same parts and gears as nested scans."""
+    text = synthesize_grid(12, 15, seed)
+    assert index_parts(text) == scan_parts(text)
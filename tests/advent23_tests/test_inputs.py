@@ -0,0 +1,41 @@
+"""Tests for loading puzzle inputs."""
+
+from pathlib import Path
+
+import pytest
+
+from advent23 import inputs
+from advent23.inputs import load
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        pytest.param("a\nbb\n\nccc\n", id="trailing-newline"),
+        pytest.param("a\nbb\n\nccc", id="no-trailing-newline"),
+        pytest.param("a\r\nbb\r\n", id="crlf"),
+        pytest.param("\n", id="newline"),
+        pytest.param("", id="empty"),
+    ],
+)
+def test_load_lines(tmp_path: Path, text: str):
+    """Lines of loaded inputs should be those of `str.splitlines`."""
+    path = tmp_path / "input.txt"
+    path.write_bytes(text.encode("utf-8"))
+    inp = load(path)
+    lines = text.splitlines()
+    assert inp == text.replace("\r\n", "\n")
+    assert list(inp.iter_lines()) == lines
+    assert [inp.line(i) for i in range(len(lines))] == lines
+    assert inp.line_offsets[-1] == len(inp)
+
+
+def test_load_once(tmp_path: Path):
+    """Inputs should only be loaded again once they change."""
+    path = tmp_path / "input.txt"
+    path.write_text("a\n", encoding="utf-8")
+    inp = load(path)
+    assert load(path) is inp
+    path.write_text("a\nb\n", encoding="utf-8")
+    assert load(path) == "a\nb\n"
+    assert inputs.LOADED[path.resolve()][1] == "a\nb\n"
@@ -0,0 +1,86 @@
+"""Tests for maps of integer ranges."""
+
+from random import Random
+
+import pytest
+
+from advent23 import EXAMPLES
+from advent23.intervals import RangeMap, compose, merge_ranges, parse_almanac
+from advent23_tests.references import naive_locations
+
+EXAMPLE = EXAMPLES["05"]
+"""Example of day 5."""
+
+
+def random_map(rng: Random) -> RangeMap:
+    """Get a map from random, non-overlapping rules over small integers."""
+    bounds = sorted(rng.sample(range(30), 2 * rng.randrange(4)))
+    return RangeMap.from_rules(
+        (src + rng.randrange(-10, 10), src, stop - src)
+        for src, stop in zip(bounds[::2], bounds[1::2], strict=True)
+    )
+
+
+def test_from_rules():
+    rmap = RangeMap.from_rules([(52, 50, 48), (50, 98, 2)])
+    assert rmap == RangeMap((50, 98, 100), (0, 2, -48, 0))
+    seeds = (0, 49, 50, 79, 97, 98, 99, 100)
+    assert [rmap(seed) for seed in seeds] == [0, 49, 52, 81, 99, 50, 51, 100]
+
+
+def test_from_rules_overlap_raises():
+    with pytest.raises(ValueError, match="overlaps"):
+        RangeMap.from_rules([(0, 5, 10), (0, 10, 10)])
+
+
+def test_from_pieces_merges():
+    assert RangeMap.from_pieces([1, 2, 2, 3], [0, 5, 7, 5, 0]) == RangeMap(
+        (1, 3), (0, 5, 0)
+    )
+
+
+def test_merge_ranges():
+    assert merge_ranges([(5, 7), (1, 3), (3, 4), (2, 2), (6, 9)]) == [(1, 4), (5, 9)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_compose(seed: int):
+    """Composed maps should map values like the maps applied in order."""
+    rng = Random(seed)
+    maps = [random_map(rng) for _ in range(3)]
+    composed = compose(maps)
+    for value in range(-20, 60):
+        expected = value
+        for rmap in maps:
+            expected = rmap(expected)
+        assert composed(value) == expected
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_map_ranges(seed: int):
+    """Mapped ranges should cover exactly the values mapped one at a time."""
+    rng = Random(seed)
+    rmap = random_map(rng)
+    ranges = [(start, start + rng.randrange(10)) for start in rng.sample(range(40), 3)]
+    assert [
+        value for start, stop in rmap.map_ranges(ranges) for value in range(start, stop)
+    ] == sorted({rmap(value) for start, stop in ranges for value in range(start, stop)})
+
+
+def test_almanac_example():
+    text = EXAMPLE.inp["a"]
+    almanac = parse_almanac(text)
+    assert list(almanac.seeds) == EXAMPLE.chk["seeds"]
+    assert almanac.locations() == naive_locations(text, almanac.seeds)
+    assert min(almanac.locations()) == EXAMPLE.chk["a"]
+    seeds = [seed for start, stop in almanac.seed_ranges for seed in range(start, stop)]
+    assert almanac.lowest_location(almanac.seed_ranges) == min(
+        naive_locations(text, seeds)
+    )
+
+
+@pytest.mark.parametrize("ranges", [[], [(5, 5)]])
+def test_lowest_location_without_seeds_raises(ranges: list[tuple[int, int]]):
+    almanac = parse_almanac(EXAMPLE.inp["a"])
+    with pytest.raises(ValueError, match="No seeds"):
+        almanac.lowest_location(ranges)
@@ -0,0 +1,78 @@
+"""Tests for scratchcards."""
+
+import numpy as np
+import pytest
+
+from advent23 import EXAMPLES
+from advent23.scratchcards import Scratchcards, parse_cards
+from advent23_tests.references import naive_cards, synthesize_cards, vectorized_cards
+
+EXAMPLE = EXAMPLES["04"]
+"""Example of day 4."""
+
+
+def with_matches(matches: list[int]) -> Scratchcards:
+    """Get scratchcards with some number of matches each."""
+    numbers = np.arange(1, max(matches) + 2)
+    winning = np.tile(numbers, (len(matches), 1))
+    drawn = np.where(numbers <= np.array(matches)[:, None], winning, 0)
+    return Scratchcards(winning, drawn)
+
+
+def test_cards_example():
+    cards = parse_cards(EXAMPLE.inp["a"])
+    chk = EXAMPLE.chk
+    assert cards.winning[0].tolist() == chk["card_one_winning_numbers"]
+    assert cards.drawn[0].tolist() == chk["card_one_drawn_numbers"]
+    assert cards.matches.tolist() == [len(w) for w in chk["cards_winning_numbers"]]
+    assert cards.points.tolist() == chk["card_scores"]
+    assert cards.copies().tolist() == list(chk["counts_after_card_six"].values())
+    assert vectorized_cards(EXAMPLE.inp["a"]) == (chk["a"], chk["b"])
+
+
+def test_matches_across_words():
+    """Numbers in every word of the bitmask should be matched, and only once each."""
+    cards = Scratchcards(
+        np.array([[0, 63, 64, 127, 128], [1, 2, 3, 4, 5]]),
+        np.array([[0, 64, 128, 129, 63], [6, 7, 8, 9, 130]]),
+    )
+    assert cards.matches.tolist() == [4, 0]
+    assert cards.points.tolist() == [8, 0]
+
+
+def test_matches_drawn_twice():
+    """Numbers drawn more than once should only match once, as with sets."""
+    text = "Card 1: 1 2 3 | 2 2 3 4\nCard 2: 5 6 7 | 8 8 8 5\n"
+    cards = parse_cards(text)
+    assert cards.matches.tolist() == [2, 1]
+    assert vectorized_cards(text) == naive_cards(text)
+
+
+@pytest.mark.parametrize(
+    ("matches", "copies"),
+    [
+        ([0, 0, 0], [1, 1, 1]),
+        ([2, 0, 0], [1, 2, 2]),
+        ([1, 1, 1], [1, 2, 3]),
+        ([5, 1, 0], [1, 2, 4]),
+        ([3, 2, 1, 0], [1, 2, 4, 8]),
+    ],
+)
+def test_copies(matches: list[int], copies: list[int]):
+    """Wins should copy later cards, stopping at the last card."""
+    assert with_matches(matches).copies().tolist() == copies
+
+
+def test_cards_synthetic():
+    """Vectorized scratchcards should score and copy cards like notebooks do."""
+    text = synthesize_cards(200)
+    assert vectorized_cards(text) == naive_cards(text)
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["", "Card 1: 1 2 | 3\nCard 2: 1 | 2\n", "Card 1: 1 2 | 3\nCard 2: 1 | 2 3\n"],
+)
+def test_parse_cards_invalid_raises(text: str):
+    with pytest.raises(ValueError, match="same number"):
+        parse_cards(text)
@@ -0,0 +1,57 @@
+"""Tests for finding matches in streams."""
+
+from io import StringIO
+from random import Random
+from re import compile
+
+import pytest
+
+from advent23.streams import finditer_stream
+
+PATTERNS = [
+    r"(?m)^a.*$",
+    r"(?m)a.*?$",
+    r"(?m)a+$",
+    r"(?m)[ab]*$",
+    r"(?m)(?<=a)b*$",
+    r"(?m)^$",
+    r"b+\Z",
+]
+"""Patterns anchored at line ends, some matching empty strings."""
+
+
+def random_text(seed: int) -> str:
+    """Get random lines of a few characters."""
+    rng = Random(seed)
+    return "".join(rng.choice("aab \n") for _ in range(rng.randrange(40)))
+
+
+def stream_spans(pattern: str, text: str, chunk_size: int, max_len: int):
+    """Get the spans of matches streamed from a text."""
+    return [
+        m.span()
+        for m in finditer_stream(compile(pattern), StringIO(text), chunk_size, max_len)
+    ]
+
+
+def test_finditer_stream_raises_on_cut_matches():
+    """Matches reaching the end of what has been read should never be cut short."""
+    with pytest.raises(ValueError, match="longer than 10"):
+        stream_spans(r"(?m)^a.*$", "a aabbbaaabaa bb", 5, 10)
+
+
+@pytest.mark.parametrize("seed", range(40))
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_finditer_stream_random(pattern: str, seed: int):
+    """Streamed matches should be those in the whole input, or raise if too long."""
+    text = random_text(seed)
+    expected = [m.span() for m in compile(pattern).finditer(text)]
+    max_len = max(map(len, text.split("\n"))) + 2
+    for chunk_size in (1, 2, 3, 5):
+        assert stream_spans(pattern, text, chunk_size, max_len) == expected
+        for short in range(1, max_len):
+            try:
+                spans = stream_spans(pattern, text, chunk_size, short)
+            except ValueError:
+                continue
+            assert spans == expected
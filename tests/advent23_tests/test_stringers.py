@@ -0,0 +1,342 @@
+"""Tests for stringers."""
+
+import signal
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from io import StringIO
+from operator import setitem
+from pathlib import Path
+from pickle import PicklingError, dumps, loads
+from re import IGNORECASE, purge, search
+from string import Template
+from time import sleep
+from typing import Any
+
+import pytest
+
+from advent23 import CheckDict
+from advent23.inputs import load
+from advent23.matches import MatchSnapshot, check_match, snapshot
+from advent23.patterns import IDLE_MATCHERS, guard_with_process, optimize_pattern
+from advent23.stringers import Stringer, StringerChecker
+from advent23_tests.stringers import NOTEBOOK_STRINGERS
+
+
+def legacy_sub(stringer: Stringer, quiet: bool = False, final: bool = True) -> str:
+    """Substitute values into root `r` by repeated substitution until a fixed point."""
+    root = stringer.root
+    node: str = legacy_sub(root, quiet) if isinstance(root, Stringer) else root
+    while node != (
+        node := getattr(
+            Template(node.replace("$$", "$$$$")),
+            "safe_substitute" if quiet else "substitute",
+        )({
+            name: legacy_sub(child, quiet, final=False)
+            if isinstance(child, Stringer)
+            else child
+            for name, child in stringer.items()
+        })
+    ):
+        pass
+    return node.replace("$$", "$") if final else node
+
+
+@pytest.mark.parametrize("quiet", [False, True])
+@pytest.mark.parametrize(
+    "stringer", NOTEBOOK_STRINGERS.values(), ids=NOTEBOOK_STRINGERS.keys()
+)
+def test_sub_notebook_stringers(stringer: Stringer, quiet: bool):
+    """Substitution matches repeated substitution for Stringers in notebooks."""
+    assert stringer.sub(quiet) == legacy_sub(stringer, quiet)
+
+
+def test_sub_quiet_resolves_child_placeholders_in_parent():
+    stringer = Stringer(r"$child", child=Stringer(r"$sibling+"), sibling=r"\d")
+    assert stringer.sub(quiet=True) == legacy_sub(stringer, quiet=True) == r"\d+"
+
+
+def test_sub_escapes():
+    stringer = Stringer(r"^$pat$$", pat=r"$$\$$$inner", inner=r"x$$")
+    assert stringer.sub() == legacy_sub(stringer) == r"^$\$x$$"
+
+
+def test_sub_missing_raises():
+    with pytest.raises(KeyError, match="missing"):
+        Stringer(r"$pat", pat=r"$missing").sub()
+
+
+def test_sub_cycle_raises():
+    with pytest.raises(ValueError, match="pat -> other -> pat"):
+        Stringer(r"$pat", pat=r"$other", other=r"$pat").sub()
+
+
+def test_sub_cache_invalidated_by_descendants():
+    """Changing a Stringer should invalidate substitutions of all its ancestors."""
+    child = Stringer(r"$leaf", leaf="a")
+    parent = Stringer(r"$child", child=child)
+    grandparent = Stringer(r"$parent+", parent=parent)
+    assert [s.sub() for s in (grandparent, parent, child)] == ["a+", "a", "a"]
+    assert grandparent.compile().pattern == "a+"
+    child.leaf = "b"
+    assert [s.sub() for s in (grandparent, parent, child)] == ["b+", "b", "b"]
+    assert grandparent.compile().pattern == "b+"
+
+
+def test_sub_cache_reused():
+    """Repeated substitution and compilation should reuse earlier results."""
+    stringer = Stringer(r"$pat+", pat=Stringer(r"\d"))
+    sub = stringer.sub()
+    pattern = stringer.compile()
+    purge()
+    assert stringer.sub() is sub
+    assert stringer.compile() is pattern
+
+
+def nested() -> Stringer:
+    """Get a Stringer with a child and a grandchild."""
+    return Stringer(
+        r"$child$sibling", child=Stringer(r"$leaf", leaf=Stringer("1")), sibling="2"
+    )
+
+
+@pytest.mark.parametrize(
+    ("change", "expected"),
+    [
+        pytest.param(
+            lambda original, result, child, leaf: setitem(child, "leaf", "3"),
+            ("32", "12"),
+            id="child-taken-before",
+        ),
+        pytest.param(
+            lambda original, result, child, leaf: setitem(leaf, "root", "3"),
+            ("32", "12"),
+            id="grandchild-taken-before",
+        ),
+        pytest.param(
+            lambda original, result, child, leaf: setitem(
+                original.child.leaf, "root", "3"
+            ),
+            ("32", "12"),
+            id="grandchild-of-original",
+        ),
+        pytest.param(
+            lambda original, result, child, leaf: setitem(
+                result.child.leaf, "root", "3"
+            ),
+            ("12", "32"),
+            id="grandchild-of-result",
+        ),
+        pytest.param(
+            lambda original, result, child, leaf: setitem(
+                result.child.set_flags(IGNORECASE), "leaf", "3"
+            ),
+            ("12", "32"),
+            id="child-of-result",
+        ),
+        pytest.param(
+            lambda original, result, child, leaf: setitem(original, "sibling", "3"),
+            ("13", "12"),
+            id="original",
+        ),
+    ],
+)
+def test_or_isolates_changes(change: Callable[..., Any], expected: tuple[str, str]):
+    """Changes on either side of `|`, even through earlier references, stay there."""
+    original = nested()
+    child = original.child
+    leaf = child.leaf
+    assert original.sub() == "12"
+    result = original | {}
+    assert result.sub() == "12"
+    change(original, result, child, leaf)
+    assert (original.sub(), result.sub()) == expected
+    assert original.child is child
+
+
+def test_or_isolates_chained_changes():
+    """Changes should stay within each Stringer in a chain of refinements."""
+    first = nested()
+    leaf = first.child.leaf
+    second = first | {}
+    third = second | dict(sibling="4")
+    leaf.root = "3"
+    second.child.leaf.root = "5"
+    assert [s.sub() for s in (first, second, third)] == ["32", "52", "14"]
+    assert [loads(dumps(s)).sub() for s in (first, second, third)] == ["32", "52", "14"]
+
+
+def test_checker_reuses_results():
+    """Checks should only run again once the pattern or the input changes."""
+    calls: list[str] = []
+
+    def matched(stringer: Stringer) -> bool:
+        calls.append(stringer.sub())
+        return bool(stringer.compile().search(str(checker.inp)))
+
+    checker = StringerChecker(CheckDict(display="headless"), inp="Game 12")
+    stringer = checker(Stringer(r"Game $num", num=r"\d"), matched=matched)
+    checker(stringer | dict(num=r"\d"))
+    assert calls == [r"Game \d"]
+    checker(stringer | dict(num=r"\d+"))
+    assert calls == [r"Game \d", r"Game \d+"]
+    checker.inp = "Game 3"
+    checker(checker.stringer)
+    assert calls == [r"Game \d", r"Game \d+", r"Game \d+"]
+    assert list(checker.timings) == ["matched"]
+    assert list(checker.results) == ["matched"]
+
+
+def test_checker_without_input_reruns():
+    """Checks should always run again if the input they match against is unknown."""
+    calls: list[str] = []
+
+    def matched(stringer: Stringer) -> str:
+        calls.append(stringer.sub())
+        return stringer.sub()
+
+    checker = StringerChecker(CheckDict(display="headless"))
+    stringer = checker(Stringer(r"Game $num", num=r"\d"), matched=matched)
+    checker(stringer | dict(num=r"\d"))
+    assert calls == [r"Game \d", r"Game \d"]
+    assert not checker.results
+
+
+RUNAWAY = Stringer(r"(?:$pat)+b", pat=r"a+")
+"""Stringer whose pattern backtracks catastrophically on inputs without a `b`."""
+
+
+def test_compile_timeout_raises():
+    with pytest.raises(TimeoutError):
+        RUNAWAY.compile(timeout=0.1).fullmatch("a" * 40)
+
+
+def in_thread(f: Callable[[], Any]) -> Any:
+    """Call a function off the main thread, returning its result or raising its error."""
+    with ThreadPoolExecutor(1) as executor:
+        return executor.submit(f).result()
+
+
+def test_compile_timeout_raises_off_main_thread():
+    with pytest.raises(TimeoutError):
+        in_thread(lambda: RUNAWAY.compile(timeout=0.5).fullmatch("a" * 40))
+
+
+@pytest.mark.parametrize("thread", [False, True], ids=["main", "thread"])
+def test_compile_timeout_matches(thread: bool):
+    """Guarded patterns should find the same matches as unguarded ones."""
+    text = "ab aab aaab"
+    pattern = RUNAWAY.compile()
+    guarded = RUNAWAY.compile(timeout=5)
+
+    def find(p: Any) -> list[Any]:
+        return [
+            [m.span() for m in [p.search(text), *p.finditer(text)]],
+            p.findall(text),
+            p.sub("x", text),
+            p.split(text),
+        ]
+
+    expected = find(pattern)
+    assert (in_thread(lambda: find(guarded)) if thread else find(guarded)) == expected
+
+
+def test_guard_with_process_keeps_matcher_after_error():
+    """Matchers should be reused after calls that couldn't be sent to them."""
+    pattern = RUNAWAY.compile()
+    with pytest.raises((PicklingError, AttributeError)):
+        guard_with_process(pattern.sub, lambda _: "", "ab", timeout=5)
+    matcher = IDLE_MATCHERS[-1]
+    assert guard_with_process(pattern.sub, "", "ab", timeout=5) == ""
+    assert IDLE_MATCHERS[-1] is matcher
+
+
+@pytest.mark.parametrize("copy", [lambda p: loads(dumps(p)), deepcopy])
+def test_compile_timeout_copies_keep_guard(copy: Callable[[Any], Any]):
+    with pytest.raises(TimeoutError):
+        copy(RUNAWAY.compile(timeout=0.1)).fullmatch("a" * 40)
+
+
+@pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="No interval timers.")
+def test_compile_timeout_restores_outer_timer():
+    """A timer set before a guarded match should still fire afterwards."""
+    fired: list[int] = []
+    previous = signal.signal(signal.SIGALRM, lambda *_: fired.append(1))
+    try:
+        signal.setitimer(signal.ITIMER_REAL, 0.3)
+        RUNAWAY.compile(timeout=0.1).fullmatch("ab")
+        assert signal.getitimer(signal.ITIMER_REAL)[0] > 0
+        sleep(0.5)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+    assert fired == [1]
+
+
+def test_profile_flags_runaway():
+    profile = RUNAWAY.profile("a" * 40, methods=["search"], repeat=1, timeout=0.1)
+    assert profile.superlinear == ["search"]
+
+
+@pytest.mark.parametrize(
+    ("pattern", "expected"),
+    [
+        (r"^(?:(?:.|\n)+)$", r"^(?s:.)+$"),
+        (r"(?P<rule>(?:\n|.)+?)\n\n", r"(?P<rule>(?s:.)+?)\n\n"),
+        (r"(?:(?:\d))+(?:ab)c", r"\d+abc"),
+        (r"(?:ab)+(?:a|b)", r"(?:ab)+(?:a|b)"),
+        (r"\(?:.|\n)[(?:.|\n)]", r"\(?:.|\n)[(?:.|\n)]"),
+        (r"(\d)\1(?:0)", r"(\d)\1(?:0)"),
+        (r"a{2(?:,3})", r"a{2(?:,3})"),
+    ],
+)
+def test_optimize_pattern(pattern: str, expected: str):
+    assert optimize_pattern(pattern) == expected
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 2**16])
+def test_finditer_stream(chunk_size: int):
+    """Streamed matches should be those found in the whole input, at the same spans."""
+    stringer = NOTEBOOK_STRINGERS["day02_games"]
+    inp = load(Path("input/blake/02.txt"))
+    expected = [(m.span(), m.groupdict()) for m in stringer.compile().finditer(inp)]
+    assert expected == [
+        (m.span(), m.groupdict())
+        for m in stringer.finditer_stream(StringIO(inp), chunk_size, max_len=200)
+    ]
+
+
+def test_match_snapshot_pickles():
+    """Snapshots should survive pickling with the groups and spans of their match."""
+    match = search(r"Game (?P<game>\d+): (?P<sets>.+)|(?P<none>x)", "...Game 12: 3 red")
+    assert match
+    pickled = loads(dumps(MatchSnapshot(match)))
+    assert check_match(pickled, match)
+    assert pickled.regs == match.regs
+    assert pickled.span("sets") == match.span("sets")
+    assert pickled["game"] == "12"
+    assert pickled["none"] is None
+    assert (pickled.text, pickled.text_start) == (match.group(), match.start())
+
+
+def test_check_dict_dumps_matches():
+    """Serialized checkpoints should compare equal, with matches compared by groups."""
+    match = search(r"(?P<num>\d+) (?P<color>\w+)", "3 red")
+    chk = CheckDict(
+        {"a": 8, "games": [match], "colors": {"red": match}}, display="headless"
+    )
+    loaded = CheckDict.loads(chk.dumps())
+    assert loaded["a"] == chk["a"]
+    assert check_match(loaded["games"][0], chk["games"][0])
+    assert check_match(loaded["colors"]["red"], chk["colors"]["red"])
+
+
+def test_snapshot_nested():
+    """Matches nested in containers should be snapshot, keeping container types."""
+    match = search(r"\d+", "a 12")
+    assert match
+    value = snapshot({"a": [match, (match, 1)], "b": "c"})
+    assert value["b"] == "c"
+    assert isinstance(value["a"][0], MatchSnapshot)
+    assert isinstance(value["a"][1], tuple)
+    assert check_match(value["a"][1][0], match)
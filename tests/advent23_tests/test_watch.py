@@ -0,0 +1,76 @@
+"""Tests for watching notebooks, inputs, and modules."""
+
+from pathlib import Path
+
+import pytest
+
+from advent23_tests import watch
+from advent23_tests.watch import Affected, WatchWorker, evict_checkpoints, get_affected
+
+USERS = ("blake", "brad")
+"""Users to watch."""
+BLAKE = {("blake", day) for day in ("01", "02", "03", "04", "05")}
+"""Attempts of one user."""
+BRAD = {("brad", day) for day in ("01", "02", "03")}
+"""Attempts of another user."""
+
+
+def test_watch_affected():
+    """Test that changes only affect attempts of the changed notebooks and days."""
+    affected = get_affected(
+        [
+            Path("src/advent23/blake/day03.ipynb"),
+            Path("input/brad/04.txt"),
+            Path("src/advent23/stranger/day01.ipynb"),
+        ],
+        days=["05"],
+        users=USERS,
+    )
+    assert affected.examples == {("blake", "03"), ("blake", "05"), ("brad", "05")}
+    assert affected.full == {("blake", "03"), ("brad", "04")}
+    assert not affected.modules
+
+
+@pytest.mark.parametrize(
+    ("module", "attempts"),
+    [
+        (Path("src/advent23/blake/__init__.py"), BLAKE),
+        (Path("src/advent23/brad/helpers.py"), BRAD),
+        (Path("src/advent23/grids.py"), BLAKE | BRAD),
+        (Path("src/advent23/stranger/__init__.py"), BLAKE | BRAD),
+    ],
+)
+def test_watch_affected_by_modules(module: Path, attempts: set[tuple[str, str]]):
+    """Modules should affect all attempts of their user, or of everyone if shared."""
+    affected = get_affected([module], users=USERS)
+    assert affected.examples == affected.full == attempts
+    assert affected.modules == {module}
+
+
+def test_evict_checkpoints(monkeypatch: pytest.MonkeyPatch):
+    """Only the latest checkpoints of each attempt should be kept."""
+    checkpoints = {
+        ("blake", "01", "old", "inp"): {},
+        ("blake", "01", "new", "old"): {},
+        ("blake", "02", "old", "inp"): {},
+    }
+    monkeypatch.setattr(watch, "CHECKPOINTS", checkpoints)
+    evict_checkpoints(("blake", "01", "new", "inp"))
+    assert list(checkpoints) == [("blake", "02", "old", "inp")]
+
+
+def test_watch_worker():
+    """Workers should check attempts, and restart when a notebook takes too long."""
+    worker = WatchWorker(timeout=1e-3)
+    affected = Affected(examples={("blake", "01")})
+    try:
+        assert list(worker.run(affected)) == [
+            "ERROR Notebook took over 0.001 s, restarted worker."
+        ]
+        worker.timeout = 60
+        *results, summary = worker.run(affected)
+    finally:
+        worker.stop()
+    assert results
+    assert all(result.startswith("PASSED blake_day01") for result in results)
+    assert summary.startswith(f"{len(results)} passed, 0 failed")
@@ -0,0 +1,307 @@
+"""Watch notebooks, inputs, and modules, re-running only the checks affected by changes.
+
+Notebooks are executed cell by cell in a warm worker process, so `advent23` and the
+modules notebooks import stay imported between runs. The worker is replaced whenever a
+module under `src/advent23` changes, so that notebooks import it afresh.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from multiprocessing.connection import Connection
+from multiprocessing.context import SpawnProcess
+from pathlib import Path
+from re import compile
+from time import perf_counter
+from typing import Any
+
+from advent23 import EXAMPLES, INPUT, get_inp
+from advent23_tests.attempts import ATTEMPTS, CHECKPOINTS, USERS, Attempt, execute
+from advent23_tests.profiling import execute_cells
+from advent23_tests.runner import TIMEOUT, Key
+
+NOTEBOOK = compile(r"^day(?P<day>\d{2})\.ipynb$")
+"""Name of a notebook attempt."""
+FULL_INPUT = compile(r"^(?P<day>\d{2})\.txt$")
+"""Name of a full input."""
+MODULE = compile(r"^\w+\.py$")
+"""Name of a module, such as a user's helper module."""
+
+
+@dataclass
+class Affected:
+    """Attempts affected by changes, as user and zero-padded day."""
+
+    examples: set[tuple[str, str]] = field(default_factory=set)
+    """Attempts to check against examples."""
+    full: set[tuple[str, str]] = field(default_factory=set)
+    """Attempts to execute on full inputs."""
+    modules: set[Path] = field(default_factory=set)
+    """Changed modules, which notebooks must import afresh."""
+
+    def __bool__(self) -> bool:
+        return bool(self.examples or self.full)
+
+
+def get_affected(
+    changes: Iterable[Path], days: Iterable[str] = (), users: Iterable[str] = USERS
+) -> Affected:
+    """Get attempts affected by changed paths and changed examples.
+
+    A changed module in a user's package affects all of their attempts. Any other
+    changed module, such as one shared by all users, affects every attempt.
+
+    Args:
+        changes: Changed notebooks, full inputs, and modules, as `<user>/dayNN.ipynb`,
+            `<user>/NN.txt`, or `<package>/<module>.py` under any parent.
+        days: Days whose examples changed, affecting every user's attempt that day.
+        users: Users to consider.
+    """
+    users = tuple(users)
+    affected = Affected(examples={(user, day) for day in days for user in users})
+    for path in changes:
+        if MODULE.match(path.name):
+            affected.modules.add(path)
+            for user in (path.parent.name,) if path.parent.name in users else users:
+                attempts = {(user, day) for day in get_days(user)}
+                affected.examples |= attempts
+                affected.full |= attempts
+            continue
+        if (user := path.parent.name) not in users:
+            continue
+        if match := NOTEBOOK.match(path.name):
+            affected.examples.add((user, match["day"]))
+            affected.full.add((user, match["day"]))
+        elif match := FULL_INPUT.match(path.name):
+            affected.full.add((user, match["day"]))
+    return affected
+
+
+def get_days(user: str) -> set[str]:
+    """Get days that a user has attempted."""
+    return {
+        match["day"]
+        for path in (ATTEMPTS / user).glob("day*.ipynb")
+        if (match := NOTEBOOK.match(path.name))
+    }
+
+
+def get_mtimes(users: Iterable[str] = USERS) -> dict[Path, int]:
+    """Get modification times of examples, modules, and notebooks and inputs of users."""
+    paths = [EXAMPLES.path, *ATTEMPTS.rglob("*.py")]
+    for user in users:
+        paths.extend((ATTEMPTS / user).glob("day*.ipynb"))
+        paths.extend((INPUT / user).glob("*.txt"))
+    mtimes: dict[Path, int] = {}
+    for path in paths:
+        try:
+            mtimes[path] = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            continue
+    return mtimes
+
+
+@dataclass
+class Watcher:
+    """Poll notebooks and inputs of users for changes, tracking what changed."""
+
+    users: tuple[str, ...] = USERS
+    """Users to watch."""
+    mtimes: dict[Path, int] = field(init=False)
+    """Modification times of watched paths as of the last poll."""
+    sources: dict[str, str] = field(init=False)
+    """Example sources by day as of the last poll."""
+
+    def __post_init__(self):
+        self.mtimes = get_mtimes(self.users)
+        self.sources = dict(EXAMPLES.sources)
+
+    def poll(self) -> Affected:
+        """Get attempts affected by changes since the last poll."""
+        mtimes = get_mtimes(self.users)
+        changes = {
+            path
+            for path in self.mtimes.keys() | mtimes.keys()
+            if self.mtimes.get(path) != mtimes.get(path)
+        }
+        self.mtimes = mtimes
+        days: set[str] = set()
+        if EXAMPLES.path in changes:
+            sources = dict(EXAMPLES.sources)
+            days = {
+                day
+                for day in self.sources.keys() | sources.keys()
+                if self.sources.get(day) != sources.get(day)
+            }
+            self.sources = sources
+        return get_affected(changes - {EXAMPLES.path}, days, self.users)
+
+
+@dataclass
+class CheckResult:
+    """Result of checking an answer against an example."""
+
+    name: str
+    """Test ID, such as `blake_day01_a`."""
+    answer: Any
+    """Answer from the attempt."""
+    expected: Any
+    """Expected answer from the example."""
+
+    @property
+    def passed(self) -> bool:
+        """Whether the answer is the expected answer."""
+        return self.answer == self.expected
+
+    def __str__(self) -> str:
+        if self.passed:
+            return f"PASSED {self.name}"
+        return f"FAILED {self.name}: {self.answer!r} != {self.expected!r}"
+
+
+def check_attempt(att: Attempt) -> Iterator[CheckResult | str]:
+    """Execute an attempt on examples and check each answer.
+
+    The attempt is executed just as it is for tests, and its checkpoints are also
+    cached in `CHECKPOINTS`, replacing those of earlier versions of the attempt.
+
+    Yields:
+        Results of each attempted check, or a description of an error.
+    """
+    if att.key not in CHECKPOINTS:
+        evict_checkpoints(att.key)
+        CHECKPOINTS[att.key] = execute(att.nb, att.inp, att.get_id(""))
+    if isinstance(chk := CHECKPOINTS[att.key], Exception):
+        yield f"ERROR {att.get_id('')}: {type(chk).__name__}: {chk}"
+        return
+    for check in att.checks:
+        yield CheckResult(
+            att.get_id(check), chk.get(check), att.get_expected_answer(check)
+        )
+
+
+def evict_checkpoints(key: Key):
+    """Evict checkpoints of other versions of an attempt or its examples.
+
+    Only the latest version of each attempt is checked again, so this bounds the
+    checkpoints held over a long session to one per attempt.
+    """
+    for old in [k for k in CHECKPOINTS if k[:2] == key[:2] and k != key]:
+        del CHECKPOINTS[old]
+
+
+def run_full(att: Attempt) -> str:
+    """Execute an attempt on its user's full inputs."""
+    if not (INPUT / att.user / f"{att.day}.txt").exists():
+        return ""
+    profile = execute_cells(
+        att.nb, {"inp": get_inp(att.day, att.user)}, after_first=True
+    )
+    return f"{'ERROR' if profile.error else 'RAN'} {att.get_id('')} on full input:" + (
+        f" {profile.error}" if profile.error else f" {profile.time * 1e3:.1f} ms"
+    )
+
+
+def run_affected(affected: Affected, full: bool = False) -> Iterator[CheckResult | str]:
+    """Run checks of affected attempts, and optionally execute them on full inputs.
+
+    Yields:
+        Results of each check, descriptions of errors and full runs, and a summary.
+    """
+    begin = perf_counter()
+    passed = failed = 0
+    for user, day in sorted(affected.examples):
+        if day not in EXAMPLES or not (att := Attempt(user, day)).nb:
+            continue
+        for result in check_attempt(att):
+            if isinstance(result, CheckResult) and result.passed:
+                passed += 1
+            else:
+                failed += 1
+            yield result
+    for user, day in sorted(affected.full) if full else ():
+        if (att := Attempt(user, day)).nb and (result := run_full(att)):
+            yield result
+    yield f"{passed} passed, {failed} failed in {perf_counter() - begin:.2f} s"
+
+
+@dataclass
+class WatchWorker:
+    """Warm worker process that runs affected attempts, sending back each result.
+
+    Modules imported by notebooks stay imported between runs, so the worker must be
+    restarted for notebooks to import changed modules afresh.
+    """
+
+    full: bool = False
+    """Also execute attempts on full inputs."""
+    timeout: float = TIMEOUT
+    """Seconds a notebook may execute before the worker is restarted."""
+    conn: Connection = field(init=False)
+    """Connection to the worker process."""
+    proc: SpawnProcess = field(init=False)
+    """Worker process."""
+
+    def __post_init__(self):
+        self.start()
+
+    def start(self):
+        """Start the worker process."""
+        ctx = get_context("spawn")
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(
+            target=serve_affected, args=(child, self.full), daemon=True
+        )
+        self.proc.start()
+        child.close()
+
+    def run(self, affected: Affected) -> Iterator[str]:
+        """Run affected attempts, restarting the worker if one hangs or crashes.
+
+        Yields:
+            Results of each check, descriptions of errors and full runs, and a summary.
+        """
+        self.conn.send(affected)
+        while True:
+            if not self.conn.poll(self.timeout):
+                self.proc.kill()
+                self.restart()
+                yield f"ERROR Notebook took over {self.timeout} s, restarted worker."
+                return
+            try:
+                line = self.conn.recv()
+            except (EOFError, OSError):
+                self.restart()
+                yield "ERROR Worker crashed, restarted worker."
+                return
+            if line is None:
+                return
+            yield line
+
+    def restart(self):
+        """Replace the worker process with a fresh one."""
+        self.stop()
+        self.start()
+
+    def stop(self):
+        """Stop the worker process."""
+        if self.proc.is_alive():
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                self.proc.kill()
+        self.proc.join(timeout=5)
+        if self.proc.is_alive():
+            self.proc.kill()
+            self.proc.join()
+        self.conn.close()
+
+
+def serve_affected(conn: Connection, full: bool):
+    """Run affected attempts received over a connection, sending back each result."""
+    while (affected := conn.recv()) is not None:
+        for result in run_affected(affected, full):
+            conn.send(str(result))
+        conn.send(None)